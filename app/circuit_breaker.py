@@ -4,13 +4,20 @@ Implements shadow mode, enforcement mode, and human-in-the-loop approval workflo
 """
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Mapping, Optional, Union
 from uuid import UUID, uuid4
 
 import httpx
+import orjson
 
-from app.config import GatewayMode, Settings, get_settings
+from app.config import (
+    GatewayMode,
+    Settings,
+    get_gateway_mode,
+    get_settings,
+    set_gateway_mode,
+)
 from app.models import (
     ActionType,
     AgentRequest,
@@ -26,6 +33,12 @@ from app.redis_client import RedisClient
 
 logger = logging.getLogger(__name__)
 
+# Max approvals a webhook worker drains from the queue in one pass
+_WEBHOOK_BATCH_MAX = 16
+
+# How long an approval stays actionable before expiring
+_APPROVAL_TTL = timedelta(hours=24)
+
 
 class ApprovalService:
     """
@@ -40,20 +53,75 @@ class ApprovalService:
     ):
         self.redis = redis_client
         self.settings = settings or get_settings()
-        self._http_client: Optional[httpx.AsyncClient] = None
-    
+        # Shared client with a bounded connection pool and warm keep-alives,
+        # so each webhook send skips TCP+TLS setup. Constructed eagerly as a
+        # hard invariant: it is never None, so the send path carries no guard.
+        self._http_client: httpx.AsyncClient = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                connect=self.settings.approval_webhook_connect_timeout,
+                read=self.settings.approval_webhook_read_timeout,
+                write=self.settings.approval_webhook_write_timeout,
+                pool=self.settings.approval_webhook_pool_timeout,
+            ),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            http2=True,
+            headers={"content-type": "application/json"},
+        )
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list = []
+        # Constant webhook payload fields, shallow-copied into each send
+        # rather than rebuilt per call.
+        self._payload_template: Dict[str, Any] = {
+            "event": "approval_requested",
+        }
+        # Caps concurrent in-flight webhook POSTs so an approval spike
+        # cannot degrade the event loop with thousands of coroutines.
+        self._sem = asyncio.Semaphore(self.settings.approval_webhook_max_concurrency)
+
     async def initialize(self, redis_client: RedisClient) -> None:
         """Initialize the approval service."""
         self.redis = redis_client
-        self._http_client = httpx.AsyncClient(
-            timeout=httpx.Timeout(self.settings.approval_webhook_timeout)
-        )
+        # Bounded queue so a webhook-service outage applies backpressure
+        # instead of accumulating unbounded coroutines.
+        self._queue = asyncio.Queue(maxsize=self.settings.approval_queue_size)
+        self._workers = [
+            asyncio.create_task(self._webhook_worker())
+            for _ in range(self.settings.approval_worker_count)
+        ]
         logger.info("Approval Service initialized")
-    
+
     async def shutdown(self) -> None:
         """Cleanup resources."""
-        if self._http_client:
-            await self._http_client.aclose()
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self._http_client.aclose()
+
+    async def _webhook_worker(self) -> None:
+        """Drain queued approvals and dispatch webhooks off the request path."""
+        while True:
+            batch = [await self._queue.get()]
+            # Opportunistically drain a batch so a burst of approvals is
+            # flushed in one pass over a warm connection.
+            while len(batch) < _WEBHOOK_BATCH_MAX:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            for approval, approval_id_hex, request_id_str in batch:
+                try:
+                    await self._send_approval_webhook(
+                        approval, approval_id_hex, request_id_str
+                    )
+                except Exception as e:
+                    logger.error(
+                        "Approval webhook dispatch failed for %s: %s", approval_id_hex, e
+                    )
+                finally:
+                    self._queue.task_done()
     
     async def request_approval(
         self,
@@ -63,6 +131,9 @@ class ApprovalService:
         """
         Create an approval request and send to external approval service.
         """
+        # One clock read per approval; requested_at/expires_at derive from it
+        # instead of separate now() calls and timedelta construction.
+        now = datetime.now(timezone.utc)
         approval_request = ApprovalRequest(
             approval_id=uuid4(),
             request_id=request.request_id,
@@ -74,81 +145,135 @@ class ApprovalService:
             matched_rules=evaluation.matched_rules,
             sanitized_parameters=evaluation.sanitized_request.get("parameters", {}),
             context=request.context,
-            expires_at=datetime.utcnow() + timedelta(hours=24),
+            requested_at=now,
+            expires_at=now + _APPROVAL_TTL,
         )
         
-        # Store in Redis for tracking
+        # Convert UUIDs to strings exactly once; every downstream consumer
+        # (Redis key, webhook payload, callback URL, logs) reuses these.
+        approval_id_hex = approval_request.approval_id.hex
+        request_id_str = str(request.request_id)
+
+        # The Redis record and the webhook hand-off are independent, so they
+        # run concurrently instead of serializing the two round-trips. The
+        # webhook goes through the worker queue so the request's critical
+        # path never awaits the external HTTP call.
+        steps = []
         if self.redis:
-            await self.redis.store_pending_approval(
-                str(approval_request.approval_id),
-                approval_request.model_dump(mode="json"),
-                ttl=86400,  # 24 hours
+            # Store in Redis for tracking (hex key, serialized exactly once)
+            steps.append(
+                self.redis.store_pending_approval(
+                    approval_id_hex,
+                    # orjson handles the slots dataclass, UUIDs, enums and
+                    # datetimes natively, straight to bytes
+                    orjson.dumps(
+                        approval_request,
+                        option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z,
+                    ),
+                )
             )
-        
-        # Send webhook to approval service
-        await self._send_approval_webhook(approval_request)
-        
-        logger.info(
-            f"Approval requested: {approval_request.approval_id} "
-            f"for request {request.request_id}"
+        if self._queue is not None:
+            steps.append(
+                self._queue.put((approval_request, approval_id_hex, request_id_str))
+            )
+        else:
+            steps.append(
+                self._send_approval_webhook(
+                    approval_request, approval_id_hex, request_id_str
+                )
+            )
+
+        results = await asyncio.gather(*steps, return_exceptions=True)
+        for result in results:
+            # Log partial failures but don't raise: the Redis record alone
+            # is recoverable, and the webhook path retries via its worker.
+            if isinstance(result, Exception):
+                logger.error(
+                    "Approval dispatch step failed for %s: %s",
+                    approval_id_hex,
+                    result,
+                )
+
+        logger.debug(
+            "Approval requested: %s for request %s", approval_id_hex, request_id_str
         )
-        
+
         return approval_request
-    
-    async def _send_approval_webhook(self, approval: ApprovalRequest) -> bool:
+
+    async def _send_approval_webhook(
+        self,
+        approval: ApprovalRequest,
+        approval_id_hex: str,
+        request_id_str: str,
+    ) -> bool:
         """Send approval request to external webhook."""
-        if not self._http_client:
-            logger.warning("HTTP client not initialized, skipping webhook")
-            return False
-        
         try:
-            payload = {
-                "event": "approval_requested",
-                "approval_id": str(approval.approval_id),
-                "request_id": str(approval.request_id),
-                "agent_id": approval.agent_id,
-                "action_type": approval.action_type.value,
-                "target_resource": approval.target_resource,
-                "risk_score": approval.risk_score,
-                "risk_level": approval.risk_level.value,
-                "matched_rules": approval.matched_rules,
-                "parameters": approval.sanitized_parameters,
-                "context": approval.context,
-                "requested_at": approval.requested_at.isoformat(),
-                "expires_at": approval.expires_at.isoformat() if approval.expires_at else None,
-                "callback_url": f"/api/v1/approvals/{approval.approval_id}/decision",
-            }
-            
-            response = await self._http_client.post(
-                self.settings.approval_webhook_url,
-                json=payload,
+            payload = self._payload_template.copy()
+            payload.update(
+                approval_id=approval_id_hex,
+                request_id=request_id_str,
+                agent_id=approval.agent_id,
+                action_type=approval.action_type.value,
+                target_resource=approval.target_resource,
+                risk_score=approval.risk_score,
+                risk_level=approval.risk_level.value,
+                matched_rules=approval.matched_rules,
+                parameters=approval.sanitized_parameters,
+                context=approval.context,
+                requested_at=approval.requested_at,
+                expires_at=approval.expires_at,
+                callback_url=f"/api/v1/approvals/{approval_id_hex}/decision",
             )
-            
+
+            # orjson serializes datetimes natively (no isoformat() calls) and
+            # posting raw bytes bypasses httpx's internal json.dumps pass.
+            body = orjson.dumps(payload, option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z)
+
+            # Per-attempt sub-timeouts are set on the client; the wait_for
+            # enforces an overall deadline covering the whole send.
+            async with self._sem:
+                response = await asyncio.wait_for(
+                    self._http_client.post(
+                        self.settings.approval_webhook_url,
+                        content=body,
+                    ),
+                    timeout=self.settings.approval_webhook_overall_timeout,
+                )
+
             if response.status_code in (200, 201, 202):
-                logger.info(f"Approval webhook sent successfully: {approval.approval_id}")
+                logger.debug("Approval webhook sent successfully: %s", approval_id_hex)
                 return True
             else:
-                logger.warning(
-                    f"Approval webhook returned {response.status_code}: {response.text}"
-                )
+                # Truncate and only decode the body when the log will be emitted;
+                # misconfigured endpoints can return large HTML error pages.
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning(
+                        "Approval webhook returned %s: %s",
+                        response.status_code,
+                        response.text[:512],
+                    )
                 return False
-                
-        except httpx.TimeoutException:
-            logger.error(f"Approval webhook timeout for {approval.approval_id}")
+
+        except (httpx.TimeoutException, asyncio.TimeoutError):
+            logger.error("Approval webhook timeout for %s", approval_id_hex)
             return False
         except httpx.RequestError as e:
-            logger.error(f"Approval webhook failed for {approval.approval_id}: {e}")
+            logger.error("Approval webhook failed for %s: %s", approval_id_hex, e)
             return False
     
     async def get_approval_status(self, approval_id: UUID) -> Optional[Dict[str, Any]]:
         """Get the status of a pending approval."""
         if self.redis:
-            return await self.redis.get_pending_approval(str(approval_id))
+            data = await self.redis.get_pending_approval(approval_id.hex)
+            if data is None:
+                # Fall back to the legacy hyphenated key during rolling migration
+                data = await self.redis.get_pending_approval(str(approval_id))
+            return data
         return None
     
     async def process_approval_decision(
         self,
-        approval_id: UUID,
+        approval_id: Union[str, UUID],
         approved: bool,
         approver_id: Optional[str] = None,
         reason: Optional[str] = None,
@@ -156,26 +281,33 @@ class ApprovalService:
         """Process an approval decision from the approval service."""
         if not self.redis:
             return None
-        
-        approval_data = await self.redis.get_pending_approval(str(approval_id))
+
+        # Accept either form; convert to UUID once at the boundary
+        if isinstance(approval_id, str):
+            approval_id = UUID(approval_id)
+
+        approval_data = await self.get_approval_status(approval_id)
         if not approval_data:
-            logger.warning(f"Approval {approval_id} not found")
+            logger.warning("Approval %s not found", approval_id)
             return None
         
-        response = ApprovalResponse(
+        response = ApprovalResponse.model_construct(
             approval_id=approval_id,
             status=ApprovalStatus.APPROVED if approved else ApprovalStatus.DENIED,
             approver_id=approver_id,
             reason=reason,
-            approved_at=datetime.utcnow(),
+            approved_at=datetime.now(timezone.utc),
         )
         
-        # Remove from pending
+        # Remove from pending (both key forms, for the rolling migration)
+        await self.redis.delete_pending_approval(approval_id.hex)
         await self.redis.delete_pending_approval(str(approval_id))
         
         logger.info(
-            f"Approval {approval_id} {'approved' if approved else 'denied'} "
-            f"by {approver_id or 'unknown'}"
+            "Approval %s %s by %s",
+            approval_id,
+            "approved" if approved else "denied",
+            approver_id or "unknown",
         )
         
         return response
@@ -194,16 +326,37 @@ class CircuitBreaker:
     ):
         self.approval_service = approval_service
         self.settings = settings or get_settings()
-    
+        self.redis: Optional[RedisClient] = None
+        # Decision dispatch table: one dict lookup instead of chained
+        # enum comparisons on every request (ALLOW is the hottest path).
+        self._handlers = {
+            DecisionType.ALLOW: self._handle_allow,
+            DecisionType.SHADOW_LOGGED: self._handle_shadow,
+            DecisionType.PENDING_APPROVAL: self._handle_pending,
+            DecisionType.DENY: self._handle_deny,
+        }
+
     async def initialize(
         self,
         redis_client: RedisClient,
         approval_service: ApprovalService,
     ) -> None:
-        """Initialize the circuit breaker."""
+        """
+        Initialize the circuit breaker.
+
+        The RedisClient must be the same pooled instance passed to
+        ApprovalService.initialize, so both components share one
+        connection pool rather than opening pools per component.
+        """
+        self.redis = redis_client
         self.approval_service = approval_service
+        if approval_service.redis is not None and approval_service.redis is not redis_client:
+            logger.warning(
+                "CircuitBreaker and ApprovalService hold different RedisClient "
+                "instances; they should share a single connection pool"
+            )
         logger.info(
-            f"Circuit Breaker initialized in {self.settings.gateway_mode.value} mode"
+            f"Circuit Breaker initialized in {get_gateway_mode().value} mode"
         )
     
     async def process(
@@ -215,97 +368,143 @@ class CircuitBreaker:
         Process a request through the circuit breaker.
         Applies shadow/enforce mode logic and human-in-the-loop for high-risk requests.
         """
-        # Determine base response
-        response = GatewayResponse(
+        # Each handler constructs its GatewayResponse exactly once, fully
+        # populated, so pydantic's __setattr__ validation never runs.
+        handler = self._handlers[evaluation.decision]
+        return await handler(request, evaluation)
+
+    async def _handle_allow(
+        self,
+        request: AgentRequest,
+        evaluation: PolicyEvaluationResult,
+    ) -> GatewayResponse:
+        """Allow the request through."""
+        return GatewayResponse.model_construct(
             request_id=request.request_id,
             status="success",
-            decision=evaluation.decision,
-            message="",
+            decision=DecisionType.ALLOW,
+            message="Request approved",
             risk_level=evaluation.risk_level,
             approval_required=False,
-            forwarded=False,
+            forwarded=True,
         )
-        
-        # Handle based on decision
-        if evaluation.decision == DecisionType.ALLOW:
-            response.status = "success"
-            response.message = "Request approved"
-            response.forwarded = True
-            
-        elif evaluation.decision == DecisionType.SHADOW_LOGGED:
-            # Shadow mode: log but don't block
-            response.status = "success"
-            response.message = (
-                "Request approved (shadow mode - would be blocked in enforce mode)"
+
+    async def _handle_shadow(
+        self,
+        request: AgentRequest,
+        evaluation: PolicyEvaluationResult,
+    ) -> GatewayResponse:
+        """Shadow mode: log but don't block."""
+        logger.warning(
+            "SHADOW MODE: Request %s would be blocked. "
+            "Risk score: %s, Matched rules: %s",
+            request.request_id,
+            evaluation.risk_score,
+            evaluation.matched_rules,
+        )
+        return GatewayResponse.model_construct(
+            request_id=request.request_id,
+            status="success",
+            decision=DecisionType.SHADOW_LOGGED,
+            message="Request approved (shadow mode - would be blocked in enforce mode)",
+            risk_level=evaluation.risk_level,
+            approval_required=False,
+            forwarded=True,
+        )
+
+    async def _handle_pending(
+        self,
+        request: AgentRequest,
+        evaluation: PolicyEvaluationResult,
+    ) -> GatewayResponse:
+        """High risk but not max - request human approval."""
+        if get_gateway_mode() == GatewayMode.SHADOW:
+            # In shadow mode, log but allow
+            return GatewayResponse.model_construct(
+                request_id=request.request_id,
+                status="success",
+                decision=DecisionType.SHADOW_LOGGED,
+                message=(
+                    "Request approved (shadow mode - would require approval in enforce mode)"
+                ),
+                risk_level=evaluation.risk_level,
+                approval_required=False,
+                forwarded=True,
+            )
+
+        # Request approval
+        approval_id = None
+        message = "Request requires human approval"
+        if self.approval_service:
+            approval = await self.approval_service.request_approval(
+                request, evaluation
+            )
+            approval_id = approval.approval_id
+            message = (
+                f"Request requires human approval. Approval ID: {approval.approval_id}"
             )
-            response.forwarded = True
+
+        return GatewayResponse.model_construct(
+            request_id=request.request_id,
+            status="pending",
+            decision=DecisionType.PENDING_APPROVAL,
+            message=message,
+            risk_level=evaluation.risk_level,
+            approval_required=True,
+            approval_id=approval_id,
+            forwarded=False,
+        )
+
+    async def _handle_deny(
+        self,
+        request: AgentRequest,
+        evaluation: PolicyEvaluationResult,
+    ) -> GatewayResponse:
+        """Deny the request, or shadow-log it in shadow mode."""
+        # Joined once and only on the (rare) DENY path
+        denial_reasons_str = "; ".join(evaluation.denial_reasons)
+        if get_gateway_mode() == GatewayMode.SHADOW:
+            # Shadow mode: log but allow
             logger.warning(
-                f"SHADOW MODE: Request {request.request_id} would be blocked. "
-                f"Risk score: {evaluation.risk_score}, "
-                f"Matched rules: {evaluation.matched_rules}"
+                "SHADOW MODE: Request %s denied. Reasons: %s",
+                request.request_id,
+                evaluation.denial_reasons,
             )
-            
-        elif evaluation.decision == DecisionType.PENDING_APPROVAL:
-            # High risk but not max - request human approval
-            if self.settings.gateway_mode == GatewayMode.SHADOW:
-                # In shadow mode, log but allow
-                response.status = "success"
-                response.decision = DecisionType.SHADOW_LOGGED
-                response.message = (
-                    "Request approved (shadow mode - would require approval in enforce mode)"
-                )
-                response.forwarded = True
-            else:
-                # Request approval
-                response.status = "pending"
-                response.approval_required = True
-                
-                if self.approval_service:
-                    approval = await self.approval_service.request_approval(
-                        request, evaluation
-                    )
-                    response.approval_id = approval.approval_id
-                    response.message = (
-                        f"Request requires human approval. Approval ID: {approval.approval_id}"
-                    )
-                else:
-                    response.message = "Request requires human approval"
-                
-                response.forwarded = False
-                
-        elif evaluation.decision == DecisionType.DENY:
-            if self.settings.gateway_mode == GatewayMode.SHADOW:
-                # Shadow mode: log but allow
-                response.status = "success"
-                response.decision = DecisionType.SHADOW_LOGGED
-                response.message = (
-                    f"Request approved (shadow mode - would be denied in enforce mode). "
-                    f"Reasons: {'; '.join(evaluation.denial_reasons)}"
-                )
-                response.forwarded = True
-                logger.warning(
-                    f"SHADOW MODE: Request {request.request_id} denied. "
-                    f"Reasons: {evaluation.denial_reasons}"
-                )
-            else:
-                # Enforce mode: block
-                response.status = "denied"
-                response.message = f"Request denied: {'; '.join(evaluation.denial_reasons)}"
-                response.forwarded = False
-        
-        return response
-    
+            return GatewayResponse.model_construct(
+                request_id=request.request_id,
+                status="success",
+                decision=DecisionType.SHADOW_LOGGED,
+                message=(
+                    "Request approved (shadow mode - would be denied in enforce mode). "
+                    f"Reasons: {denial_reasons_str}"
+                ),
+                risk_level=evaluation.risk_level,
+                approval_required=False,
+                forwarded=True,
+            )
+
+        # Enforce mode: block
+        return GatewayResponse.model_construct(
+            request_id=request.request_id,
+            status="denied",
+            decision=DecisionType.DENY,
+            message=f"Request denied: {denial_reasons_str}",
+            risk_level=evaluation.risk_level,
+            approval_required=False,
+            forwarded=False,
+        )
+
     def get_mode(self) -> GatewayMode:
         """Get current gateway mode."""
-        return self.settings.gateway_mode
+        return get_gateway_mode()
     
     async def set_mode(self, mode: GatewayMode) -> None:
         """
         Change the gateway mode at runtime.
         Note: In production, this would be persisted to Redis.
         """
-        old_mode = self.settings.gateway_mode
-        self.settings.gateway_mode = mode
+        old_mode = get_gateway_mode()
+        set_gateway_mode(mode)
         logger.info(f"Gateway mode changed from {old_mode.value} to {mode.value}")
 
 
@@ -323,11 +522,14 @@ class MockApprovalService:
         request: ApprovalRequest,
     ) -> Dict[str, Any]:
         """Handle incoming approval request (mock endpoint)."""
-        self._pending[str(request.approval_id)] = request
-        
+        approval_id_hex = request.approval_id.hex
+        # Copy-on-write: allocate only on mutation, so readers holding the
+        # previous reference keep a stable snapshot.
+        self._pending = {**self._pending, approval_id_hex: request}
+
         return {
             "status": "received",
-            "approval_id": str(request.approval_id),
+            "approval_id": approval_id_hex,
             "message": "Approval request received and queued for review",
             "estimated_wait_time": "15 minutes",
         }
@@ -341,12 +543,12 @@ class MockApprovalService:
         if delay_seconds > 0:
             await asyncio.sleep(delay_seconds)
         
-        return ApprovalResponse(
+        return ApprovalResponse.model_construct(
             approval_id=UUID(approval_id),
             status=ApprovalStatus.APPROVED,
             approver_id="mock_approver",
             reason="Auto-approved for testing",
-            approved_at=datetime.utcnow(),
+            approved_at=datetime.now(timezone.utc),
         )
     
     async def auto_deny(
@@ -355,17 +557,17 @@ class MockApprovalService:
         reason: str = "Auto-denied for testing",
     ) -> ApprovalResponse:
         """Auto-deny a request (for testing)."""
-        return ApprovalResponse(
+        return ApprovalResponse.model_construct(
             approval_id=UUID(approval_id),
             status=ApprovalStatus.DENIED,
             approver_id="mock_approver",
             reason=reason,
-            approved_at=datetime.utcnow(),
+            approved_at=datetime.now(timezone.utc),
         )
     
-    def get_pending(self) -> Dict[str, ApprovalRequest]:
-        """Get all pending approvals."""
-        return self._pending.copy()
+    def get_pending(self) -> Mapping[str, ApprovalRequest]:
+        """Get a stable snapshot of all pending approvals (no copy on read)."""
+        return self._pending
 
 
 # Global instances
@@ -7,7 +7,7 @@ from functools import lru_cache
 from typing import Optional
 
 from pydantic import Field, field_validator
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class GatewayMode(str, Enum):
@@ -29,15 +29,23 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     workers: int = 4
+    # Load the spaCy model at import time. Under a preloading process
+    # manager (gunicorn --preload) the import runs in the master, so
+    # workers share the model pages copy-on-write instead of each
+    # loading their own ~50 MiB copy.
+    preload_pii_model: bool = False
     
     # Redis
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_db: int = 0
     redis_password: Optional[str] = None
+    redis_pool_size: int = 50
     redis_policy_prefix: str = "sentinel:policy:"
     redis_rate_limit_prefix: str = "sentinel:ratelimit:"
     policy_cache_ttl: int = 300  # 5 minutes
+    # In-process read cache in front of the Redis policy cache
+    policy_read_cache_ttl: float = 5.0
     
     # PostgreSQL
     postgres_host: str = "localhost"
@@ -47,47 +55,85 @@ class Settings(BaseSettings):
     postgres_db: str = "sentinel_audit"
     postgres_pool_size: int = 20
     postgres_max_overflow: int = 10
+    # Set when connections go through pgBouncer (or similar); the engine
+    # then skips its own pooling and statement caching.
+    use_external_pooler: bool = False
     
     # Security
     api_key_prefix: str = "agent_sk_"
     api_key_min_length: int = 32
+    # Strings shorter than this skip the NLP pass during PII scanning
+    # and rely on the regex patterns alone
+    pii_nlp_min_length: int = 8
+    # Use google-re2 (linear-time DFA, no backtracking) for the fallback
+    # PII patterns when the library is installed
+    pii_fallback_re2: bool = False
     
     # Circuit Breaker
     risk_score_block_threshold: float = 1.0
     risk_score_approval_threshold: float = 0.8
     approval_webhook_url: str = "http://localhost:8001/approval"
-    approval_webhook_timeout: float = 5.0
+    approval_webhook_connect_timeout: float = 2.0
+    approval_webhook_read_timeout: float = 15.0
+    approval_webhook_write_timeout: float = 10.0
+    approval_webhook_pool_timeout: float = 2.0
+    approval_webhook_overall_timeout: float = 30.0
+    approval_worker_count: int = 2
+    approval_queue_size: int = 1000
+    approval_webhook_max_concurrency: int = 16
     
+    # Health probes
+    health_probe_timeout: float = 2.0
+
     # Rate Limiting
     rate_limit_requests: int = 1000
     rate_limit_window_seconds: int = 60
+    # Tokens reserved from Redis per batch by the local bucket
+    rate_limit_local_batch: int = 10
     
     # Observability
     log_level: str = "INFO"
     metrics_enabled: bool = True
+    # Audit write buffering: rows per COPY flush and max time entries
+    # wait in the buffer before a flush cycle picks them up
+    log_buffer_size: int = 100
+    log_buffer_time_ms: float = 50.0
+    # How long a serialized /metrics payload may be served from cache
+    metrics_cache_ttl: float = 1.0
+    # How often the sharded in-process counters drain into Prometheus
+    metrics_flush_interval: float = 1.0
     
-    @property
-    def redis_url(self) -> str:
-        """Construct Redis URL from components."""
-        auth = f":{self.redis_password}@" if self.redis_password else ""
-        return f"redis://{auth}{self.redis_host}:{self.redis_port}/{self.redis_db}"
-    
-    @property
-    def postgres_url(self) -> str:
-        """Construct PostgreSQL URL from components."""
-        return (
-            f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}"
-            f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
-        )
-    
-    @property
-    def postgres_sync_url(self) -> str:
-        """Construct synchronous PostgreSQL URL for migrations."""
-        return (
-            f"postgresql://{self.postgres_user}:{self.postgres_password}"
-            f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
-        )
-    
+    # Connection URLs - computed once in model_post_init so reads are
+    # plain attribute loads instead of per-access f-string construction.
+    # May also be supplied directly via environment.
+    redis_url: str = ""
+    postgres_url: str = ""
+    postgres_sync_url: str = ""
+
+    def model_post_init(self, __context) -> None:
+        """Precompute connection URLs from components unless set explicitly."""
+        if not self.redis_url:
+            auth = f":{self.redis_password}@" if self.redis_password else ""
+            object.__setattr__(
+                self,
+                "redis_url",
+                f"redis://{auth}{self.redis_host}:{self.redis_port}/{self.redis_db}",
+            )
+        if not self.postgres_url:
+            object.__setattr__(
+                self,
+                "postgres_url",
+                f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}"
+                f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}",
+            )
+        if not self.postgres_sync_url:
+            object.__setattr__(
+                self,
+                "postgres_sync_url",
+                f"postgresql://{self.postgres_user}:{self.postgres_password}"
+                f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}",
+            )
+
     @field_validator('gateway_mode', mode='before')
     @classmethod
     def validate_gateway_mode(cls, v: str) -> GatewayMode:
@@ -95,13 +141,35 @@ class Settings(BaseSettings):
             return GatewayMode(v.upper())
         return v
     
-    class Config:
-        env_prefix = "SENTINEL_"
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(
+        env_prefix="SENTINEL_",
+        env_file=".env",
+        case_sensitive=False,
+        # Immutable settings let pydantic take its fast attribute path;
+        # the runtime-mutable gateway mode lives outside Settings below.
+        frozen=True,
+    )
 
 
 @lru_cache()
 def get_settings() -> Settings:
     """Get cached settings instance."""
     return Settings()
+
+
+# Runtime gateway-mode override. Settings is frozen, so mode changes made
+# via the API are tracked here; readers go through get_gateway_mode().
+_runtime_gateway_mode: Optional[GatewayMode] = None
+
+
+def get_gateway_mode() -> GatewayMode:
+    """Get the effective gateway mode (runtime override or configured default)."""
+    if _runtime_gateway_mode is not None:
+        return _runtime_gateway_mode
+    return get_settings().gateway_mode
+
+
+def set_gateway_mode(mode: GatewayMode) -> None:
+    """Override the gateway mode at runtime."""
+    global _runtime_gateway_mode
+    _runtime_gateway_mode = mode
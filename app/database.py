@@ -2,25 +2,33 @@
 Sentinel Gateway Database Module.
 Handles PostgreSQL connections and audit log persistence.
 """
+import asyncio
 import logging
+import time
+from collections import deque
 from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from itertools import islice
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple
 from uuid import UUID
 
+import orjson
 from sqlalchemy import (
     JSON,
     Boolean,
     Column,
+    Computed,
+    Date,
     DateTime,
     Float,
     Index,
-    Integer,
+    PrimaryKeyConstraint,
     String,
     Text,
+    select,
     text,
 )
-from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.pool import NullPool
@@ -31,6 +39,64 @@ from app.models import AuditLogEntry, DecisionType, RiskLevel
 logger = logging.getLogger(__name__)
 
 
+def _json_dumps(obj: Any) -> str:
+    """orjson-backed serializer for the engine's JSON columns."""
+    return orjson.dumps(obj).decode()
+
+
+def _ensure_aware(dt: Optional[datetime]) -> Optional[datetime]:
+    """Treat naive filter datetimes as UTC.
+
+    Stored timestamps are timezone-aware; a naive query parameter would
+    otherwise be bound in the process-local timezone by asyncpg and
+    raise on comparison against aware buffered entries.
+    """
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+# Minimum seconds between real SELECT 1 probes in health_check
+_HEALTH_CHECK_INTERVAL = 5.0
+
+# Minimum seconds between "audit logging is down" error logs when
+# entries are dropped because the flush task never started
+_AUDIT_DROP_LOG_INTERVAL = 60.0
+
+# Per-session server settings applied to every pooled connection. JIT only
+# hurts this service's short OLTP statements; the I/O concurrency knobs let
+# cold audit scans issue deep prefetch (and feed io_uring on PG18 servers
+# configured with io_method=io_uring, which itself is server-side only);
+# partitionwise aggregation pairs with the monthly audit partitions.
+_SERVER_SETTINGS = {
+    "jit": "off",
+    "effective_io_concurrency": "256",
+    "maintenance_io_concurrency": "256",
+    "enable_partitionwise_aggregate": "on",
+}
+
+# Column order for copy_records_to_table; must match _audit_row_tuple.
+_AUDIT_COPY_COLUMNS = (
+    "log_id",
+    "request_id",
+    "agent_id",
+    "action_type",
+    "target_resource",
+    "decision",
+    "risk_score",
+    "risk_level",
+    "matched_rules",
+    "pii_detected",
+    "pii_fields",
+    "gateway_mode",
+    "sanitized_request",
+    "response_status",
+    "processing_time_ms",
+    "client_ip",
+    "user_agent",
+    "timestamp",
+)
+
+
 class Base(DeclarativeBase):
     """SQLAlchemy declarative base."""
     pass
@@ -40,8 +106,7 @@ class AuditLog(Base):
     """Audit log table for persistent storage."""
     __tablename__ = "audit_logs"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    log_id = Column(PG_UUID(as_uuid=True), unique=True, nullable=False, index=True)
+    log_id = Column(PG_UUID(as_uuid=True), nullable=False, index=True)
     request_id = Column(PG_UUID(as_uuid=True), nullable=False, index=True)
     agent_id = Column(String(128), nullable=False, index=True)
     action_type = Column(String(64), nullable=False, index=True)
@@ -49,22 +114,70 @@ class AuditLog(Base):
     decision = Column(String(32), nullable=False, index=True)
     risk_score = Column(Float, nullable=False)
     risk_level = Column(String(16), nullable=False, index=True)
-    matched_rules = Column(ARRAY(String), default=[])
-    pii_detected = Column(Boolean, default=False, index=True)
-    pii_fields = Column(ARRAY(String), default=[])
+    # Defaults live on the server so Python never allocates (or worse,
+    # shares) placeholder values per row
+    matched_rules = Column(JSONB, server_default=text("'[]'::jsonb"))
+    pii_detected = Column(Boolean, server_default=text('false'))
+    pii_fields = Column(JSONB, server_default=text("'[]'::jsonb"))
     gateway_mode = Column(String(16), nullable=False)
-    sanitized_request = Column(JSON, default={})
+    sanitized_request = Column(JSONB, server_default=text("'{}'::jsonb"))
     response_status = Column(String(32), nullable=False)
     processing_time_ms = Column(Float, nullable=False)
     client_ip = Column(String(45), nullable=True)
     user_agent = Column(String(512), nullable=True)
-    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
-    
+    # Part of the primary key: range-partitioned tables must include the
+    # partition column in the PK.
+    # Timestamp-led primary key below doubles as the time index
+    timestamp = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text('now()'),
+    )
+    # Coarse day bucket for cheap range pruning on time-only queries;
+    # callers pair it with the exact timestamp predicate for refinement.
+    # AT TIME ZONE keeps the expression immutable as generated columns
+    # require.
+    timestamp_day = Column(
+        Date,
+        Computed("(timestamp AT TIME ZONE 'UTC')::date", persisted=True),
+        index=True,
+    )
+
     # Composite indexes for common queries
     __table_args__ = (
+        PrimaryKeyConstraint('timestamp', 'log_id'),
         Index('ix_audit_agent_timestamp', 'agent_id', 'timestamp'),
         Index('ix_audit_decision_timestamp', 'decision', 'timestamp'),
         Index('ix_audit_risk_level_timestamp', 'risk_level', 'timestamp'),
+        # GIN indexes so @> containment filters on these fields stay fast
+        Index('ix_audit_matched_rules_gin', 'matched_rules', postgresql_using='gin'),
+        Index('ix_audit_pii_fields_gin', 'pii_fields', postgresql_using='gin'),
+        # Partial indexes for the heavily skewed slices: most rows have
+        # pii_detected=false and are not CRITICAL, so dedicated tiny
+        # indexes beat full-column ones for these filters
+        Index(
+            'ix_audit_pii_true_ts',
+            'timestamp',
+            postgresql_where=text('pii_detected = true'),
+        ),
+        Index(
+            'ix_audit_critical_ts',
+            'timestamp',
+            postgresql_where=text("risk_level = 'CRITICAL'"),
+        ),
+        # BRIN tracks the append-only timestamp order at a fraction of a
+        # btree's size for large range scans
+        Index(
+            'ix_audit_ts_brin',
+            'timestamp',
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32},
+        ),
+        {
+            'postgresql_partition_by': 'RANGE (timestamp)',
+            # No insert ever reads generated values back
+            'implicit_returning': False,
+        },
     )
 
 
@@ -72,21 +185,28 @@ class PolicyAudit(Base):
     """Policy change audit table."""
     __tablename__ = "policy_audits"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
     policy_id = Column(String(128), nullable=False, index=True)
     action = Column(String(32), nullable=False)  # created, updated, deleted
     old_value = Column(JSON, nullable=True)
     new_value = Column(JSON, nullable=True)
     changed_by = Column(String(128), nullable=True)
-    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    timestamp = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text('now()'),
+    )
+
+    __table_args__ = (
+        PrimaryKeyConstraint('timestamp', 'policy_id'),
+        {'postgresql_partition_by': 'RANGE (timestamp)', 'implicit_returning': False},
+    )
 
 
 class ApprovalAudit(Base):
     """Approval decision audit table."""
     __tablename__ = "approval_audits"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    approval_id = Column(PG_UUID(as_uuid=True), unique=True, nullable=False, index=True)
+    approval_id = Column(PG_UUID(as_uuid=True), nullable=False, index=True)
     request_id = Column(PG_UUID(as_uuid=True), nullable=False, index=True)
     agent_id = Column(String(128), nullable=False, index=True)
     action_type = Column(String(64), nullable=False)
@@ -94,9 +214,18 @@ class ApprovalAudit(Base):
     status = Column(String(32), nullable=False, index=True)
     approver_id = Column(String(128), nullable=True)
     reason = Column(Text, nullable=True)
-    requested_at = Column(DateTime, nullable=False)
-    decided_at = Column(DateTime, nullable=True)
-    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow)
+    requested_at = Column(DateTime(timezone=True), nullable=False)
+    decided_at = Column(DateTime(timezone=True), nullable=True)
+    timestamp = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text('now()'),
+    )
+
+    __table_args__ = (
+        PrimaryKeyConstraint('timestamp', 'approval_id'),
+        {'postgresql_partition_by': 'RANGE (timestamp)', 'implicit_returning': False},
+    )
 
 
 class Database:
@@ -106,16 +235,51 @@ class Database:
         self.settings = settings or get_settings()
         self._engine = None
         self._session_factory = None
+        # Write buffer: log_audit appends, the flush task drains in COPY
+        # batches, and get_audit_logs merges unflushed entries on top of
+        # query results for read-your-writes freshness. One batch pays a
+        # single lock/permission/type check instead of one per row.
+        self._buffer_size = self.settings.log_buffer_size
+        self._buffer_interval = self.settings.log_buffer_time_ms / 1000.0
+        self._pending: deque = deque()
+        self._pending_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        # Entries dropped because audit logging is unavailable, plus the
+        # monotonic time of the last drop log (rate-limited)
+        self._dropped_audits = 0
+        self._last_drop_log = 0.0
+        self._audit_insert_stmt = None
+        self._connected = False
+        self._last_health_check = 0.0
+        self._last_health_ok = False
     
     async def connect(self) -> None:
         """Initialize database connection and create tables."""
         try:
+            # With an external pooler (pgBouncer in transaction mode) the
+            # engine must not pool or prepare-cache on its own; otherwise
+            # keep a sized in-process pool to avoid per-request handshakes.
+            if self.settings.use_external_pooler:
+                engine_kwargs: Dict[str, Any] = {
+                    "poolclass": NullPool,
+                    "connect_args": {"statement_cache_size": 0},
+                }
+            else:
+                engine_kwargs = {
+                    "pool_size": self.settings.postgres_pool_size,
+                    "max_overflow": self.settings.postgres_max_overflow,
+                    "pool_recycle": 1800,
+                    "pool_timeout": 5,
+                    "connect_args": {"server_settings": _SERVER_SETTINGS},
+                }
+
             self._engine = create_async_engine(
                 self.settings.postgres_url,
-                pool_size=self.settings.postgres_pool_size,
-                max_overflow=self.settings.postgres_max_overflow,
                 pool_pre_ping=True,
                 echo=self.settings.debug,
+                json_serializer=_json_dumps,
+                json_deserializer=orjson.loads,
+                **engine_kwargs,
             )
             
             self._session_factory = async_sessionmaker(
@@ -128,29 +292,111 @@ class Database:
             # Create tables
             async with self._engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
-            
+
+            await self._setup_partitions()
+
+            # Start the background audit flusher
+            self._audit_insert_stmt = AuditLog.__table__.insert()
+            self._flush_task = asyncio.create_task(self._audit_flush_loop())
+
+            self._connected = True
             logger.info("PostgreSQL connection established and tables created")
-            
+
         except Exception as e:
             logger.error(f"Failed to connect to PostgreSQL: {e}")
             raise
-    
+
+    async def _setup_partitions(self) -> None:
+        """Partition the audit tables by month, with a safe fallback.
+
+        pg_partman manages monthly range partitions where the extension
+        is installed. A partitioned parent with no partitions rejects
+        every write, so each table is also guaranteed a DEFAULT
+        partition: on the stock postgres image (no partman) it receives
+        all rows, and when partman is managing the table it has already
+        created a default of the same name and the statement no-ops.
+        """
+        partman_available = True
+        try:
+            async with self._engine.begin() as conn:
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_partman"))
+        except Exception as e:
+            logger.warning(
+                f"pg_partman extension unavailable, using DEFAULT partitions: {e}"
+            )
+            partman_available = False
+
+        for table in ("audit_logs", "policy_audits", "approval_audits"):
+            if partman_available:
+                try:
+                    async with self._engine.begin() as conn:
+                        await conn.execute(
+                            text(
+                                "SELECT partman.create_parent("
+                                "p_parent_table => :tbl, p_control => 'timestamp', "
+                                "p_interval => 'monthly')"
+                            ),
+                            {"tbl": f"public.{table}"},
+                        )
+                except Exception as e:
+                    # Already registered on restart, or partman not configured
+                    logger.debug(f"Partition setup for {table} skipped: {e}")
+            try:
+                async with self._engine.begin() as conn:
+                    await conn.execute(
+                        text(
+                            f"CREATE TABLE IF NOT EXISTS {table}_default "
+                            f"PARTITION OF {table} DEFAULT"
+                        )
+                    )
+            except Exception as e:
+                logger.error(
+                    f"Failed to ensure DEFAULT partition for {table}: {e}"
+                )
+
     async def disconnect(self) -> None:
         """Close database connection."""
+        self._connected = False
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        # Graceful drain: persist whatever the flush loop had not written
+        if self._pending and self._engine:
+            try:
+                while self._pending:
+                    buffered = list(islice(self._pending, self._buffer_size))
+                    await self._flush_audit_batch([row for _, row in buffered])
+                    for _ in buffered:
+                        self._pending.popleft()
+            except Exception as e:
+                logger.error(f"Failed to drain audit buffer on shutdown: {e}")
         if self._engine:
             await self._engine.dispose()
         logger.info("PostgreSQL connection closed")
     
     async def is_connected(self) -> bool:
-        """Check if database is connected."""
+        """Check if database is connected (tracked flag, no round-trip)."""
+        return self._connected
+
+    async def health_check(self) -> bool:
+        """Probe the database, rate-limited to one SELECT 1 per interval."""
+        if not self._engine:
+            return False
+        now = time.monotonic()
+        if now - self._last_health_check < _HEALTH_CHECK_INTERVAL:
+            return self._last_health_ok
+        self._last_health_check = now
         try:
-            if self._engine:
-                async with self._engine.connect() as conn:
-                    await conn.execute(text("SELECT 1"))
-                return True
+            async with self._engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            self._last_health_ok = True
         except Exception:
-            pass
-        return False
+            self._last_health_ok = False
+        return self._last_health_ok
     
     @asynccontextmanager
     async def session(self) -> AsyncGenerator[AsyncSession, None]:
@@ -168,39 +414,290 @@ class Database:
         finally:
             await session.close()
     
+    async def _autocommit_insert(self, stmt) -> None:
+        """Run a single-row insert without a BEGIN/COMMIT pair.
+
+        One round-trip instead of three; only the batched COPY flush
+        keeps an explicit transaction.
+        """
+        async with self._engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(stmt)
+
+    @staticmethod
+    def _audit_row_tuple(entry: AuditLogEntry) -> Tuple:
+        """Build the COPY row for an entry, ordered as _AUDIT_COPY_COLUMNS."""
+        return (
+            entry.log_id,
+            entry.request_id,
+            entry.agent_id,
+            entry.action_type.value,
+            entry.target_resource,
+            entry.decision.value,
+            entry.risk_score,
+            entry.risk_level.value,
+            _json_dumps(entry.matched_rules),
+            entry.pii_detected,
+            _json_dumps(entry.pii_fields),
+            entry.gateway_mode,
+            _json_dumps(entry.sanitized_request),
+            entry.response_status,
+            entry.processing_time_ms,
+            entry.client_ip,
+            entry.user_agent,
+            entry.timestamp,
+        )
+
+    def enqueue_audit(self, entry: AuditLogEntry) -> bool:
+        """Buffer an audit log entry for batched persistence.
+
+        Fire-and-forget: no awaiting, so request handlers pay only the
+        enqueue cost and never a DB round-trip.
+        """
+        if not self._flush_task:
+            # Reachable in normal operation: lifespan continues in
+            # degraded mode when the DB never connected. Shout
+            # periodically instead of dropping entries silently.
+            self._dropped_audits += 1
+            now = time.monotonic()
+            if now - self._last_drop_log >= _AUDIT_DROP_LOG_INTERVAL:
+                self._last_drop_log = now
+                logger.error(
+                    f"Audit logging unavailable; dropped "
+                    f"{self._dropped_audits} entries since startup"
+                )
+            return False
+        # Serialize once here — enum .value and attribute lookups are done
+        # a single time per entry, and the flush loop just collects tuples.
+        self._pending.append((entry, self._audit_row_tuple(entry)))
+        return True
+
     async def log_audit(self, entry: AuditLogEntry) -> bool:
-        """Write an audit log entry to the database."""
+        """Awaitable wrapper around enqueue_audit, kept for compatibility."""
+        return self.enqueue_audit(entry)
+
+    async def _audit_flush_loop(self) -> None:
+        """Drain buffered audit entries and flush them in COPY batches."""
+        while True:
+            try:
+                await asyncio.sleep(self._buffer_interval)
+                while self._pending:
+                    # Peek the batches and only pop after the writes land,
+                    # so concurrent reads keep seeing the entries. Two
+                    # batches flush in parallel on separate pooled
+                    # connections, overlapping one COPY with the other's
+                    # commit ack.
+                    buffered = list(islice(self._pending, self._buffer_size * 2))
+                    batches = [
+                        buffered[i:i + self._buffer_size]
+                        for i in range(0, len(buffered), self._buffer_size)
+                    ]
+                    await asyncio.gather(
+                        *(
+                            self._flush_audit_batch([row for _, row in b])
+                            for b in batches
+                        )
+                    )
+                    # The lock is held only around the synchronous pops;
+                    # the COPY awaits above run lock-free so enqueuers and
+                    # readers never serialize behind database I/O.
+                    async with self._pending_lock:
+                        for _ in buffered:
+                            self._pending.popleft()
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Audit flush loop error: {e}")
+
+    async def _flush_audit_batch(self, batch: List[Tuple]) -> None:
+        """Flush a batch of audit rows via asyncpg COPY."""
         try:
-            async with self.session() as session:
-                audit_log = AuditLog(
-                    log_id=entry.log_id,
-                    request_id=entry.request_id,
-                    agent_id=entry.agent_id,
-                    action_type=entry.action_type.value,
-                    target_resource=entry.target_resource,
-                    decision=entry.decision.value,
-                    risk_score=entry.risk_score,
-                    risk_level=entry.risk_level.value,
-                    matched_rules=entry.matched_rules,
-                    pii_detected=entry.pii_detected,
-                    pii_fields=entry.pii_fields,
-                    gateway_mode=entry.gateway_mode,
-                    sanitized_request=entry.sanitized_request,
-                    response_status=entry.response_status,
-                    processing_time_ms=entry.processing_time_ms,
-                    client_ip=entry.client_ip,
-                    user_agent=entry.user_agent,
-                    timestamp=entry.timestamp,
+            async with self._engine.begin() as conn:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    "audit_logs",
+                    records=batch,
+                    columns=list(_AUDIT_COPY_COLUMNS),
                 )
-                session.add(audit_log)
-                await session.commit()
-                logger.debug(f"Audit log written: {entry.log_id}")
-                return True
-                
+            logger.debug(f"Flushed {len(batch)} audit rows via COPY")
         except Exception as e:
-            logger.error(f"Failed to write audit log: {e}")
-            return False
+            logger.error(f"COPY flush failed, falling back to row inserts: {e}")
+            await self._insert_audit_rows(batch)
+
+    async def _insert_audit_rows(self, batch: List[Tuple]) -> None:
+        """Core executemany fallback for when the COPY path fails.
+
+        Skips ORM object construction and unit-of-work tracking; one
+        execute frame carries the whole batch.
+        """
+        try:
+            params = []
+            for row in batch:
+                values = dict(zip(_AUDIT_COPY_COLUMNS, row))
+                # JSONB fields are pre-serialized for COPY; the Core types
+                # serialize on their own, so hand them the decoded values.
+                for field in ("matched_rules", "pii_fields", "sanitized_request"):
+                    values[field] = orjson.loads(values[field])
+                params.append(values)
+            async with self.session() as session:
+                await session.execute(self._audit_insert_stmt, params)
+        except Exception as e:
+            logger.error(f"Failed to write audit batch: {e}")
     
+    @staticmethod
+    def _entry_matches(
+        entry: AuditLogEntry,
+        agent_id: Optional[str],
+        action_type: Optional[str],
+        decision: Optional[str],
+        risk_level: Optional[str],
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+    ) -> bool:
+        """Apply get_audit_logs filters to a buffered entry."""
+        if agent_id and entry.agent_id != agent_id:
+            return False
+        if action_type and entry.action_type.value != action_type:
+            return False
+        if decision and entry.decision.value != decision:
+            return False
+        if risk_level and entry.risk_level.value != risk_level:
+            return False
+        if start_time and entry.timestamp < start_time:
+            return False
+        if end_time and entry.timestamp > end_time:
+            return False
+        return True
+
+    @staticmethod
+    def _entry_view(entry: AuditLogEntry) -> Dict[str, Any]:
+        """Render a buffered entry in the get_audit_logs row shape."""
+        return {
+            "log_id": str(entry.log_id),
+            "request_id": str(entry.request_id),
+            "agent_id": entry.agent_id,
+            "action_type": entry.action_type.value,
+            "target_resource": entry.target_resource,
+            "decision": entry.decision.value,
+            "risk_score": entry.risk_score,
+            "risk_level": entry.risk_level.value,
+            "matched_rules": entry.matched_rules,
+            "pii_detected": entry.pii_detected,
+            "gateway_mode": entry.gateway_mode,
+            "processing_time_ms": entry.processing_time_ms,
+            "timestamp": entry.timestamp.isoformat(),
+        }
+
+    @staticmethod
+    def _audit_logs_stmt(
+        agent_id: Optional[str],
+        action_type: Optional[str],
+        decision: Optional[str],
+        risk_level: Optional[str],
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+    ):
+        """Build the filtered audit-log select shared by list and export."""
+        # Project only the list-view columns; sanitized_request in
+        # particular is a large blob the listing never shows.
+        stmt = select(
+            AuditLog.log_id,
+            AuditLog.request_id,
+            AuditLog.agent_id,
+            AuditLog.action_type,
+            AuditLog.target_resource,
+            AuditLog.decision,
+            AuditLog.risk_score,
+            AuditLog.risk_level,
+            AuditLog.matched_rules,
+            AuditLog.pii_detected,
+            AuditLog.gateway_mode,
+            AuditLog.processing_time_ms,
+            AuditLog.timestamp,
+        )
+
+        if agent_id:
+            stmt = stmt.where(AuditLog.agent_id == agent_id)
+        if action_type:
+            stmt = stmt.where(AuditLog.action_type == action_type)
+        if decision:
+            stmt = stmt.where(AuditLog.decision == decision)
+        if risk_level:
+            stmt = stmt.where(AuditLog.risk_level == risk_level)
+        if start_time:
+            # Coarse day-bucket predicate lets the planner prune on
+            # the small day index before the exact timestamp check
+            stmt = stmt.where(AuditLog.timestamp_day >= start_time.date())
+            stmt = stmt.where(AuditLog.timestamp >= start_time)
+        if end_time:
+            stmt = stmt.where(AuditLog.timestamp_day <= end_time.date())
+            stmt = stmt.where(AuditLog.timestamp <= end_time)
+
+        return stmt.order_by(AuditLog.timestamp.desc())
+
+    @staticmethod
+    def _row_view(row) -> Dict[str, Any]:
+        """Render a result-row mapping in the get_audit_logs row shape."""
+        return {
+            "log_id": str(row["log_id"]),
+            "request_id": str(row["request_id"]),
+            "agent_id": row["agent_id"],
+            "action_type": row["action_type"],
+            "target_resource": row["target_resource"],
+            "decision": row["decision"],
+            "risk_score": row["risk_score"],
+            "risk_level": row["risk_level"],
+            "matched_rules": row["matched_rules"],
+            "pii_detected": row["pii_detected"],
+            "gateway_mode": row["gateway_mode"],
+            "processing_time_ms": row["processing_time_ms"],
+            "timestamp": row["timestamp"].isoformat(),
+        }
+
+    async def iter_audit_logs(
+        self,
+        agent_id: Optional[str] = None,
+        action_type: Optional[str] = None,
+        decision: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream audit logs row by row for large exports.
+
+        Rows come off a server-side cursor, so memory stays O(row) no
+        matter how much the filters match. Unflushed buffer entries are
+        yielded first (they are the newest rows); within each segment
+        ordering is newest-first.
+        """
+        start_time = _ensure_aware(start_time)
+        end_time = _ensure_aware(end_time)
+        # Entries stay in the buffer until their COPY commits, so one may
+        # already exist in the DB result; remember what was yielded from
+        # the buffer and skip those rows.
+        yielded_ids = set()
+        for entry, _ in reversed(list(self._pending)):
+            if self._entry_matches(
+                entry, agent_id, action_type, decision,
+                risk_level, start_time, end_time,
+            ):
+                yielded_ids.add(str(entry.log_id))
+                yield self._entry_view(entry)
+
+        stmt = self._audit_logs_stmt(
+            agent_id, action_type, decision, risk_level, start_time, end_time
+        )
+        async with self.session() as session:
+            result = await session.stream(
+                stmt.execution_options(yield_per=500)
+            )
+            async for row in result.mappings():
+                view = self._row_view(row)
+                if view["log_id"] in yielded_ids:
+                    continue
+                yield view
+
     async def get_audit_logs(
         self,
         agent_id: Optional[str] = None,
@@ -214,47 +711,48 @@ class Database:
     ) -> List[Dict[str, Any]]:
         """Query audit logs with filters."""
         try:
+            start_time = _ensure_aware(start_time)
+            end_time = _ensure_aware(end_time)
             async with self.session() as session:
-                query = session.query(AuditLog)
-                
-                if agent_id:
-                    query = query.filter(AuditLog.agent_id == agent_id)
-                if action_type:
-                    query = query.filter(AuditLog.action_type == action_type)
-                if decision:
-                    query = query.filter(AuditLog.decision == decision)
-                if risk_level:
-                    query = query.filter(AuditLog.risk_level == risk_level)
-                if start_time:
-                    query = query.filter(AuditLog.timestamp >= start_time)
-                if end_time:
-                    query = query.filter(AuditLog.timestamp <= end_time)
-                
-                query = query.order_by(AuditLog.timestamp.desc())
-                query = query.limit(limit).offset(offset)
-                
-                results = await session.execute(query)
-                logs = results.scalars().all()
-                
-                return [
-                    {
-                        "log_id": str(log.log_id),
-                        "request_id": str(log.request_id),
-                        "agent_id": log.agent_id,
-                        "action_type": log.action_type,
-                        "target_resource": log.target_resource,
-                        "decision": log.decision,
-                        "risk_score": log.risk_score,
-                        "risk_level": log.risk_level,
-                        "matched_rules": log.matched_rules,
-                        "pii_detected": log.pii_detected,
-                        "gateway_mode": log.gateway_mode,
-                        "processing_time_ms": log.processing_time_ms,
-                        "timestamp": log.timestamp.isoformat(),
-                    }
-                    for log in logs
-                ]
-                
+                stmt = self._audit_logs_stmt(
+                    agent_id, action_type, decision,
+                    risk_level, start_time, end_time,
+                )
+                # Paginate after merging in the unflushed buffer below
+                stmt = stmt.limit(limit + offset)
+
+                # Stream with a server-side cursor so large limits don't
+                # buffer the whole result before the first row is handled
+                result = await session.stream(
+                    stmt.execution_options(yield_per=500)
+                )
+
+                logs = []
+                seen_ids = set()
+                async for row in result.mappings():
+                    view = self._row_view(row)
+                    logs.append(view)
+                    seen_ids.add(view["log_id"])
+
+            # Read-your-writes: surface entries still sitting in the write
+            # buffer so callers see what they just logged. Entries stay
+            # buffered until their COPY commits, so one may already be in
+            # the query result; skip those instead of listing them twice.
+            pending = [
+                self._entry_view(entry)
+                for entry, _ in list(self._pending)
+                if str(entry.log_id) not in seen_ids
+                and self._entry_matches(
+                    entry, agent_id, action_type, decision,
+                    risk_level, start_time, end_time,
+                )
+            ]
+            if pending:
+                logs.extend(pending)
+                logs.sort(key=lambda log: log["timestamp"], reverse=True)
+
+            return logs[offset:offset + limit]
+
         except Exception as e:
             logger.error(f"Failed to query audit logs: {e}")
             return []
@@ -266,52 +764,52 @@ class Database:
     ) -> Dict[str, Any]:
         """Get aggregate statistics from audit logs."""
         try:
+            start_time = _ensure_aware(start_time)
+            end_time = _ensure_aware(end_time)
             async with self.session() as session:
-                # Base time filter
-                time_filter = ""
-                if start_time:
-                    time_filter += f" AND timestamp >= '{start_time.isoformat()}'"
-                if end_time:
-                    time_filter += f" AND timestamp <= '{end_time.isoformat()}'"
-                
-                # Total counts by decision
-                result = await session.execute(text(f"""
-                    SELECT 
-                        decision,
-                        COUNT(*) as count,
-                        AVG(processing_time_ms) as avg_latency,
-                        AVG(risk_score) as avg_risk
-                    FROM audit_logs
-                    WHERE 1=1 {time_filter}
-                    GROUP BY decision
-                """))
-                
+                # Total counts by decision. Bound parameters keep the
+                # statement text stable so the prepared-statement cache
+                # is reused across calls.
+                result = await session.execute(
+                    text("""
+                        SELECT
+                            decision,
+                            COUNT(*) as count,
+                            AVG(processing_time_ms) as avg_latency,
+                            AVG(risk_score) as avg_risk
+                        FROM audit_logs
+                        WHERE (CAST(:start_time AS timestamp) IS NULL
+                               OR (timestamp_day >= CAST(:start_time AS date)
+                                   AND timestamp >= :start_time))
+                          AND (CAST(:end_time AS timestamp) IS NULL
+                               OR (timestamp_day <= CAST(:end_time AS date)
+                                   AND timestamp <= :end_time))
+                        GROUP BY GROUPING SETS ((decision), ())
+                    """),
+                    {"start_time": start_time, "end_time": end_time},
+                )
+
                 stats = {
                     "total_requests": 0,
                     "by_decision": {},
                     "avg_latency_ms": 0.0,
                     "avg_risk_score": 0.0,
                 }
-                
-                rows = result.fetchall()
-                total_latency = 0.0
-                total_risk = 0.0
-                
-                for row in rows:
+
+                for row in result.fetchall():
                     decision, count, avg_lat, avg_risk = row
-                    stats["by_decision"][decision] = {
-                        "count": count,
-                        "avg_latency_ms": float(avg_lat or 0),
-                        "avg_risk_score": float(avg_risk or 0),
-                    }
-                    stats["total_requests"] += count
-                    total_latency += (avg_lat or 0) * count
-                    total_risk += (avg_risk or 0) * count
-                
-                if stats["total_requests"] > 0:
-                    stats["avg_latency_ms"] = total_latency / stats["total_requests"]
-                    stats["avg_risk_score"] = total_risk / stats["total_requests"]
-                
+                    if decision is None:
+                        # Grand-total row from the empty grouping set
+                        stats["total_requests"] = count
+                        stats["avg_latency_ms"] = float(avg_lat or 0)
+                        stats["avg_risk_score"] = float(avg_risk or 0)
+                    else:
+                        stats["by_decision"][decision] = {
+                            "count": count,
+                            "avg_latency_ms": float(avg_lat or 0),
+                            "avg_risk_score": float(avg_risk or 0),
+                        }
+
                 return stats
                 
         except Exception as e:
@@ -328,17 +826,16 @@ class Database:
     ) -> bool:
         """Log a policy change for auditing."""
         try:
-            async with self.session() as session:
-                audit = PolicyAudit(
+            await self._autocommit_insert(
+                PolicyAudit.__table__.insert().values(
                     policy_id=policy_id,
                     action=action,
                     old_value=old_value,
                     new_value=new_value,
                     changed_by=changed_by,
                 )
-                session.add(audit)
-                await session.commit()
-                return True
+            )
+            return True
         except Exception as e:
             logger.error(f"Failed to log policy change: {e}")
             return False
@@ -358,8 +855,8 @@ class Database:
     ) -> bool:
         """Log an approval decision."""
         try:
-            async with self.session() as session:
-                audit = ApprovalAudit(
+            await self._autocommit_insert(
+                ApprovalAudit.__table__.insert().values(
                     approval_id=approval_id,
                     request_id=request_id,
                     agent_id=agent_id,
@@ -368,12 +865,11 @@ class Database:
                     status=status,
                     approver_id=approver_id,
                     reason=reason,
-                    requested_at=requested_at or datetime.utcnow(),
+                    requested_at=requested_at or datetime.now(timezone.utc),
                     decided_at=decided_at,
                 )
-                session.add(audit)
-                await session.commit()
-                return True
+            )
+            return True
         except Exception as e:
             logger.error(f"Failed to log approval: {e}")
             return False
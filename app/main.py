@@ -5,14 +5,16 @@ Main FastAPI Application
 A production-ready, scalable middleware platform that governs multiple concurrent AI Agents.
 Acts as a "Zero-Trust" proxy between Agents and their tools (Databases, APIs, SaaS).
 """
+import asyncio
 import time
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID
 
+import orjson
 from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 
 from app.circuit_breaker import (
     ApprovalService,
@@ -22,15 +24,15 @@ from app.circuit_breaker import (
     get_approval_service,
     get_circuit_breaker,
 )
-from app.config import GatewayMode, Settings, get_settings
+from app.config import GatewayMode, Settings, get_gateway_mode, get_settings
 from app.database import AuditLogEntry, Database, database, get_database
 from app.metrics import metrics_collector
 from app.middleware import (
-    AuthenticationMiddleware,
+    AuthAndRateLimitMiddleware,
     ErrorHandlingMiddleware,
-    RateLimitMiddleware,
     RequestLoggingMiddleware,
     setup_structured_logging,
+    shutdown_structured_logging,
     structured_logger,
 )
 from app.models import (
@@ -52,6 +54,19 @@ from app.redis_client import RedisClient, get_redis, redis_client
 # Application startup time
 START_TIME = time.time()
 
+# Settings are frozen, so one module-level fetch serves every request;
+# the runtime-mutable gateway mode is read via get_gateway_mode().
+SETTINGS = get_settings()
+
+# When configured, load the PII model during import rather than in the
+# per-worker lifespan: a preloading process manager imports this module
+# once in the master, and forked workers then share the model pages
+# copy-on-write. initialize() is idempotent, so the lifespan call
+# becomes a no-op in that case. Presidio's analyze path is read-only
+# over the loaded model, so sharing the engine across forks is safe.
+if SETTINGS.preload_pii_model:
+    policy_engine.pii_sanitizer.initialize()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -63,7 +78,7 @@ async def lifespan(app: FastAPI):
     structured_logger.info(
         "Starting Sentinel Gateway",
         version=settings.app_version,
-        mode=settings.gateway_mode.value,
+        mode=get_gateway_mode().value,
     )
     
     # Initialize Redis
@@ -82,21 +97,24 @@ async def lifespan(app: FastAPI):
         structured_logger.error("PostgreSQL connection failed", error=str(e))
         # Continue without database (audit logs disabled)
     
-    # Initialize Policy Engine
-    await policy_engine.initialize(redis_client)
+    # Policy engine and approval service initialize independently (each
+    # does its own Redis round-trips), so run them concurrently and pay
+    # the slower of the two instead of their sum.
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(policy_engine.initialize(redis_client))
+        tg.create_task(approval_service.initialize(redis_client))
     structured_logger.info("Policy Engine initialized")
-    
-    # Initialize Approval Service
-    await approval_service.initialize(redis_client)
     structured_logger.info("Approval Service initialized")
-    
-    # Initialize Circuit Breaker
+
+    # The circuit breaker wires in the approval service, so it waits for
+    # the group above.
     await circuit_breaker.initialize(redis_client, approval_service)
     structured_logger.info("Circuit Breaker initialized")
     
-    # Update initial metrics
+    # Update initial metrics and start the sharded-counter flush task
     policies = await policy_engine.get_active_policies()
     metrics_collector.set_active_policies(len(policies))
+    metrics_collector.start()
     
     structured_logger.info(
         "Sentinel Gateway started successfully",
@@ -108,11 +126,14 @@ async def lifespan(app: FastAPI):
     # Shutdown
     structured_logger.info("Shutting down Sentinel Gateway")
     
+    await metrics_collector.shutdown()
+    await policy_engine.shutdown()
     await approval_service.shutdown()
     await redis_client.disconnect()
     await database.disconnect()
     
     structured_logger.info("Sentinel Gateway shutdown complete")
+    shutdown_structured_logging()
 
 
 # Create FastAPI application
@@ -133,12 +154,12 @@ app = FastAPI(
     lifespan=lifespan,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # Add middleware (order matters - last added = first executed)
 app.add_middleware(ErrorHandlingMiddleware)
-app.add_middleware(RateLimitMiddleware)
-app.add_middleware(AuthenticationMiddleware)
+app.add_middleware(AuthAndRateLimitMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
 
 
@@ -155,17 +176,36 @@ async def root():
     }
 
 
+async def _probe_dependency(coro) -> bool:
+    """Run a dependency probe with a hard timeout; failures read as down."""
+    try:
+        return await asyncio.wait_for(
+            coro, timeout=SETTINGS.health_probe_timeout
+        )
+    except Exception:
+        return False
+
+
+async def _probe_dependencies() -> tuple:
+    """Probe Redis and PostgreSQL concurrently.
+
+    Latency is the max of the two probes rather than their sum, which
+    matters when one dependency is timing out under a k8s probe budget.
+    """
+    return await asyncio.gather(
+        _probe_dependency(redis_client.is_connected()),
+        _probe_dependency(database.health_check()),
+    )
+
+
 @app.get("/health", response_model=HealthStatus, tags=["Health"])
 async def health_check():
     """Comprehensive health check."""
-    settings = get_settings()
-    
-    redis_connected = await redis_client.is_connected()
-    postgres_connected = await database.is_connected()
-    
+    redis_connected, postgres_connected = await _probe_dependencies()
+
     # Update system metrics
     metrics_collector.update_system_status(
-        gateway_mode=1 if settings.gateway_mode == GatewayMode.SHADOW else 0,
+        gateway_mode=1 if get_gateway_mode() == GatewayMode.SHADOW else 0,
         redis_connected=redis_connected,
         postgres_connected=postgres_connected,
     )
@@ -174,8 +214,8 @@ async def health_check():
     
     return HealthStatus(
         status=status,
-        version=settings.app_version,
-        gateway_mode=settings.gateway_mode.value,
+        version=SETTINGS.app_version,
+        gateway_mode=get_gateway_mode().value,
         redis_connected=redis_connected,
         postgres_connected=postgres_connected,
         uptime_seconds=time.time() - START_TIME,
@@ -185,9 +225,8 @@ async def health_check():
 @app.get("/health/ready", tags=["Health"])
 async def readiness_check():
     """Kubernetes readiness probe."""
-    redis_connected = await redis_client.is_connected()
-    postgres_connected = await database.is_connected()
-    
+    redis_connected, postgres_connected = await _probe_dependencies()
+
     if not redis_connected or not postgres_connected:
         raise HTTPException(
             status_code=503,
@@ -208,14 +247,41 @@ async def liveness_check():
 @app.get("/metrics", tags=["Observability"])
 async def prometheus_metrics():
     """Prometheus metrics endpoint."""
+    payload = await metrics_collector.generate_metrics_cached()
     return PlainTextResponse(
-        content=metrics_collector.generate_metrics().decode("utf-8"),
+        content=payload,
         media_type=metrics_collector.get_content_type(),
     )
 
 
 # ==================== Gateway API ====================
 
+def _record_denied(agent_id: str, action_type: str, evaluation) -> None:
+    # Truncate here so repeat reasons hit the bound-child cache
+    reason = (
+        evaluation.denial_reasons[0][:50]
+        if evaluation.denial_reasons else "policy"
+    )
+    metrics_collector.record_blocked_request(agent_id, action_type, reason)
+
+
+def _record_shadow(agent_id: str, action_type: str, evaluation) -> None:
+    metrics_collector.record_shadow_logged(agent_id, action_type)
+
+
+def _record_allowed(agent_id: str, action_type: str, evaluation) -> None:
+    metrics_collector.record_approved_request(agent_id, action_type)
+
+
+# One hash lookup replaces the enum-comparison chain per request;
+# PENDING_APPROVAL deliberately records nothing here.
+_DECISION_RECORDERS = {
+    DecisionType.DENY: _record_denied,
+    DecisionType.SHADOW_LOGGED: _record_shadow,
+    DecisionType.ALLOW: _record_allowed,
+}
+
+
 @app.post(
     "/api/v1/gateway/evaluate",
     response_model=GatewayResponse,
@@ -237,79 +303,95 @@ async def prometheus_metrics():
     - **403**: Request denied by policy
     """,
 )
-async def evaluate_request(
-    request: Request,
-    agent_request: AgentRequest,
-    policy_engine_dep: PolicyEngine = Depends(get_policy_engine),
-    circuit_breaker_dep: CircuitBreaker = Depends(get_circuit_breaker),
-    db: Database = Depends(get_database),
-    redis: RedisClient = Depends(get_redis),
-):
-    """Evaluate an agent request through the governance gateway."""
-    start_time = time.perf_counter()
-    settings = get_settings()
-    
+async def evaluate_request(request: Request, agent_request: AgentRequest):
+    """Evaluate an agent request through the governance gateway.
+
+    The hot path references the module-level singletons directly rather
+    than taking `Depends(...)` parameters: FastAPI's dependency solver
+    runs per request, and on this endpoint the injected objects are
+    always the same globals. The cold management endpoints keep Depends
+    for test-time overrides; here, tests monkeypatch the module
+    attributes instead.
+    """
+    # Integer nanosecond arithmetic; converted to float once at the end.
+    start_ns = time.monotonic_ns()
+
     # Get agent info from authenticated request
     agent_id = getattr(request.state, "agent_id", agent_request.agent_id)
     
     try:
-        # Step 1: Evaluate against policy engine
-        evaluation = await policy_engine_dep.evaluate(agent_request)
-        
+        # Step 1+2: Fused policy evaluation and circuit-breaker pass
+        evaluation, response = await policy_engine.evaluate_and_decide(
+            agent_request, circuit_breaker
+        )
+
+        # Bind the enum payloads once; the metrics calls below would
+        # otherwise repeat the same .value attribute lookups per request.
+        action_type_value = agent_request.action_type.value
+        decision = response.decision
+        decision_value = decision.value
+        risk_level_value = evaluation.risk_level.value
+
         # Record policy evaluation metrics
         metrics_collector.record_policy_evaluation_time(
             evaluation.evaluation_time_ms / 1000
         )
-        
+
         for rule_id in evaluation.matched_rules:
-            metrics_collector.record_policy_match(
-                rule_id, agent_request.action_type.value
-            )
-        
+            metrics_collector.record_policy_match(rule_id, action_type_value)
+
         # Record PII detection
         if evaluation.pii_detected:
             metrics_collector.record_pii_detection(
                 agent_id, evaluation.pii_fields
             )
-        
-        # Step 2: Process through circuit breaker
-        response = await circuit_breaker_dep.process(agent_request, evaluation)
-        
+
         # Step 3: Record metrics
-        latency_seconds = time.perf_counter() - start_time
+        latency_seconds = (time.monotonic_ns() - start_ns) * 1e-9
         
         metrics_collector.record_request(
             agent_id=agent_id,
-            action_type=agent_request.action_type.value,
-            decision=response.decision.value,
+            action_type=action_type_value,
+            decision=decision_value,
             latency_seconds=latency_seconds,
             risk_score=evaluation.risk_score,
         )
         
         if evaluation.risk_level in (RiskLevel.HIGH, RiskLevel.CRITICAL):
             metrics_collector.record_high_risk_request(
-                agent_id, agent_request.action_type.value, evaluation.risk_level.value
+                agent_id, action_type_value, risk_level_value
             )
         
-        if response.decision == DecisionType.DENY:
-            metrics_collector.record_blocked_request(
-                agent_id,
-                agent_request.action_type.value,
-                evaluation.denial_reasons[0] if evaluation.denial_reasons else "policy",
-            )
-        elif response.decision == DecisionType.SHADOW_LOGGED:
-            metrics_collector.record_shadow_logged(
-                agent_id, agent_request.action_type.value
-            )
-        elif response.decision == DecisionType.ALLOW:
-            metrics_collector.record_approved_request(
-                agent_id, agent_request.action_type.value
-            )
+        recorder = _DECISION_RECORDERS.get(decision)
+        if recorder:
+            recorder(agent_id, action_type_value, evaluation)
         
         # Record latency to Redis for percentile calculations
-        await redis.record_latency(latency_seconds * 1000)
+        await redis_client.record_latency(latency_seconds * 1000)
         
-        # Step 4: Write audit log
+        # Step 4: Write audit log. sanitized_request stays None when
+        # nothing was redacted, so the audit row falls back to the raw
+        # payload (identical to what sanitization would have produced).
+        # Denials also leave it None, but their payload was never
+        # sanitized, so they keep storing an empty object rather than
+        # leaking unredacted fields.
+        sanitized_request = evaluation.sanitized_request
+        if sanitized_request is None:
+            if decision != DecisionType.DENY:
+                sanitized_request = {
+                    "parameters": agent_request.parameters,
+                    "context": agent_request.context,
+                    "agent_id": agent_id,
+                    "action_type": action_type_value,
+                    "target_resource": agent_request.target_resource,
+                }
+            else:
+                sanitized_request = {}
+        
+        # Every field below is already typed by the validated request or
+        # produced internally; AuditLogEntry is a slots dataclass so this
+        # is a plain allocation (log_id and timestamp still come from
+        # their default factories).
         audit_entry = AuditLogEntry(
             request_id=agent_request.request_id,
             agent_id=agent_id,
@@ -321,29 +403,33 @@ async def evaluate_request(
             matched_rules=evaluation.matched_rules,
             pii_detected=evaluation.pii_detected,
             pii_fields=evaluation.pii_fields,
-            gateway_mode=settings.gateway_mode.value,
-            sanitized_request=evaluation.sanitized_request or {},
+            gateway_mode=get_gateway_mode().value,
+            sanitized_request=sanitized_request,
             response_status=response.status,
             processing_time_ms=latency_seconds * 1000,
             client_ip=request.client.host if request.client else None,
             user_agent=request.headers.get("user-agent"),
+            # Reuse the response's clock read; the audit row and the
+            # response describe the same instant.
+            timestamp=response.timestamp,
         )
         
-        await db.log_audit(audit_entry)
-        
-        # Step 5: Return appropriate response
-        if response.decision == DecisionType.PENDING_APPROVAL:
-            return JSONResponse(
-                status_code=202,
-                content=response.model_dump(mode="json"),
-            )
-        elif response.decision == DecisionType.DENY:
-            return JSONResponse(
-                status_code=403,
-                content=response.model_dump(mode="json"),
-            )
+        database.enqueue_audit(audit_entry)
         
-        return response
+        # Step 5: Return the response. model_dump_json goes straight to
+        # bytes, and handing FastAPI a prebuilt Response on every branch
+        # skips the response-model validation walk over the model graph.
+        if decision == DecisionType.PENDING_APPROVAL:
+            status_code = 202
+        elif decision == DecisionType.DENY:
+            status_code = 403
+        else:
+            status_code = 200
+        return Response(
+            status_code=status_code,
+            content=response.model_dump_json(exclude_none=True),
+            media_type="application/json",
+        )
         
     except Exception as e:
         structured_logger.error(
@@ -528,7 +614,7 @@ async def submit_approval_decision(
 # ==================== Gateway Mode Management ====================
 
 @app.get("/api/v1/gateway/mode", tags=["Gateway"])
-async def get_gateway_mode(
+async def read_gateway_mode(
     circuit_breaker_dep: CircuitBreaker = Depends(get_circuit_breaker),
 ):
     """Get current gateway mode."""
@@ -543,7 +629,7 @@ async def get_gateway_mode(
 
 
 @app.put("/api/v1/gateway/mode", tags=["Gateway"])
-async def set_gateway_mode(
+async def update_gateway_mode(
     mode: GatewayMode,
     circuit_breaker_dep: CircuitBreaker = Depends(get_circuit_breaker),
 ):
@@ -588,6 +674,39 @@ async def get_audit_logs(
     return {"logs": logs, "count": len(logs), "limit": limit, "offset": offset}
 
 
+async def _ndjson_stream(rows) -> "AsyncIterator[bytes]":
+    """Serialize an async row iterator as newline-delimited JSON."""
+    async for row in rows:
+        yield orjson.dumps(row) + b"\n"
+
+
+@app.get("/api/v1/audit/logs/export", tags=["Audit"])
+async def export_audit_logs(
+    agent_id: Optional[str] = Query(None),
+    action_type: Optional[str] = Query(None),
+    decision: Optional[str] = Query(None),
+    risk_level: Optional[str] = Query(None),
+    db: Database = Depends(get_database),
+):
+    """Stream matching audit logs as NDJSON.
+
+    Unlike the paginated listing, rows go out as they come off the
+    server-side cursor, so exports of any size run in O(row) memory
+    with immediate time-to-first-byte.
+    """
+    return StreamingResponse(
+        _ndjson_stream(
+            db.iter_audit_logs(
+                agent_id=agent_id,
+                action_type=action_type,
+                decision=decision,
+                risk_level=risk_level,
+            )
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
 @app.get("/api/v1/audit/stats", tags=["Audit"])
 async def get_audit_stats(
     db: Database = Depends(get_database),
@@ -616,19 +735,30 @@ async def get_metrics_summary(
     policy_engine_dep: PolicyEngine = Depends(get_policy_engine),
 ):
     """Get a summary of key metrics."""
-    latency_percentiles = await redis.get_latency_percentiles()
-    policies = await policy_engine_dep.get_active_policies()
-    
+    # One MGET for the counters, overlapped with the other two fetches
+    counters, latency_percentiles, policies = await asyncio.gather(
+        redis.get_metrics_bulk([
+            "total_requests",
+            "blocked_requests",
+            "approved_requests",
+            "pending_approvals",
+            "shadow_logged",
+            "pii_detections",
+        ]),
+        redis.get_latency_percentiles(),
+        policy_engine_dep.get_active_policies(),
+    )
+
     return MetricsSummary(
-        total_requests=await redis.get_metric("total_requests"),
-        blocked_requests=await redis.get_metric("blocked_requests"),
-        approved_requests=await redis.get_metric("approved_requests"),
-        pending_approvals=await redis.get_metric("pending_approvals"),
-        shadow_logged=await redis.get_metric("shadow_logged"),
+        total_requests=counters["total_requests"],
+        blocked_requests=counters["blocked_requests"],
+        approved_requests=counters["approved_requests"],
+        pending_approvals=counters["pending_approvals"],
+        shadow_logged=counters["shadow_logged"],
         avg_latency_ms=latency_percentiles.get("avg", 0.0),
         p95_latency_ms=latency_percentiles.get("p95", 0.0),
         p99_latency_ms=latency_percentiles.get("p99", 0.0),
-        pii_detections=await redis.get_metric("pii_detections"),
+        pii_detections=counters["pii_detections"],
         active_policies=len(policies),
         uptime_seconds=metrics_collector.get_uptime(),
     )
@@ -644,4 +774,5 @@ if __name__ == "__main__":
         port=settings.port,
         workers=settings.workers,
         reload=settings.debug,
+        loop="uvloop",
     )
@@ -2,9 +2,13 @@
 Sentinel Gateway Metrics Module.
 Prometheus-compatible metrics collection and exposure.
 """
+import asyncio
 import time
+from functools import lru_cache
 from typing import Any, Callable, Dict
 
+from app.config import get_settings
+
 from prometheus_client import (
     CONTENT_TYPE_LATEST,
     Counter,
@@ -80,6 +84,16 @@ REQUESTS_WITH_PII = Counter(
     ["agent_id"],
 )
 
+PII_CACHE_LOOKUPS = Counter(
+    "sentinel_pii_cache_lookups_total",
+    "PII sanitize-cache lookups by result",
+    ["result"],
+)
+
+# The two children are fixed, so bind them once
+_PII_CACHE_HITS = PII_CACHE_LOOKUPS.labels(result="hit")
+_PII_CACHE_MISSES = PII_CACHE_LOOKUPS.labels(result="miss")
+
 # ==================== Policy Metrics ====================
 
 ACTIVE_POLICIES = Gauge(
@@ -136,6 +150,92 @@ RATE_LIMIT_REMAINING = Gauge(
 )
 
 
+# ==================== Label cardinality ====================
+# Each unique label tuple allocates a child metric that lives for the
+# process lifetime and inflates every scrape. Agent IDs are caller
+# supplied, so cap how many distinct ones become labels and fold the
+# rest into a single overflow bucket.
+
+_AGENT_LABEL_LIMIT = 1000
+_OVERFLOW_AGENT = "_overflow"
+_known_agents: set = set()
+
+
+def _bound_agent(agent_id: str) -> str:
+    """Map an agent ID to a bounded label value."""
+    if agent_id in _known_agents:
+        return agent_id
+    if len(_known_agents) < _AGENT_LABEL_LIMIT:
+        _known_agents.add(agent_id)
+        return agent_id
+    return _OVERFLOW_AGENT
+
+
+# ==================== Bound children ====================
+# .labels() hashes the label tuple and takes the metric's lock on every
+# call; these caches resolve each label combination once and hand back
+# the bound child, leaving a single lock acquisition per update.
+
+@lru_cache(maxsize=4096)
+def _request_count(agent_id: str, action_type: str, decision: str):
+    return REQUEST_COUNT.labels(agent_id, action_type, decision)
+
+
+@lru_cache(maxsize=256)
+def _request_latency(action_type: str):
+    return REQUEST_LATENCY.labels(action_type)
+
+
+@lru_cache(maxsize=256)
+def _risk_score(action_type: str):
+    return RISK_SCORE.labels(action_type)
+
+
+@lru_cache(maxsize=4096)
+def _blocked_requests(agent_id: str, action_type: str, reason: str):
+    return BLOCKED_REQUESTS.labels(agent_id, action_type, reason)
+
+
+@lru_cache(maxsize=4096)
+def _approved_requests(agent_id: str, action_type: str):
+    return APPROVED_REQUESTS.labels(agent_id, action_type)
+
+
+@lru_cache(maxsize=4096)
+def _shadow_logged(agent_id: str, action_type: str):
+    return SHADOW_LOGGED.labels(agent_id, action_type)
+
+
+@lru_cache(maxsize=4096)
+def _high_risk_requests(agent_id: str, action_type: str, risk_level: str):
+    return HIGH_RISK_REQUESTS.labels(agent_id, action_type, risk_level)
+
+
+@lru_cache(maxsize=256)
+def _pii_detections(entity_type: str):
+    return PII_DETECTIONS.labels(entity_type)
+
+
+@lru_cache(maxsize=1024)
+def _requests_with_pii(agent_id: str):
+    return REQUESTS_WITH_PII.labels(agent_id)
+
+
+@lru_cache(maxsize=4096)
+def _policy_matches(rule_id: str, action_type: str):
+    return POLICY_MATCHES.labels(rule_id, action_type)
+
+
+@lru_cache(maxsize=1024)
+def _rate_limited_requests(agent_id: str):
+    return RATE_LIMITED_REQUESTS.labels(agent_id)
+
+
+@lru_cache(maxsize=1024)
+def _rate_limit_remaining(agent_id: str):
+    return RATE_LIMIT_REMAINING.labels(agent_id)
+
+
 class MetricsCollector:
     """
     Centralized metrics collection and reporting.
@@ -143,6 +243,72 @@ class MetricsCollector:
     
     def __init__(self):
         self._start_time = time.time()
+        # Scrape snapshot cache: generate_latest walks every child of
+        # every collector, so serve the same bytes for a short TTL and
+        # coalesce concurrent regenerations behind one lock holder.
+        settings = get_settings()
+        self._cache_ttl = settings.metrics_cache_ttl
+        self._cached_payload: bytes = b""
+        self._cached_at: float = 0.0
+        self._cache_lock = asyncio.Lock()
+        # Sharded hot counters: every prometheus_client .inc()/.observe()
+        # takes the metric's lock, so the per-request path accumulates
+        # into plain dicts (safe under asyncio's single thread) and a
+        # background task drains them into the real metrics. Scrapes are
+        # 5-15s apart, so the sub-second flush delay is invisible.
+        self._flush_interval = settings.metrics_flush_interval
+        self._pending_counts: Dict[tuple, int] = {}
+        self._pending_latencies: Dict[str, list] = {}
+        self._pending_risk_scores: Dict[str, list] = {}
+        self._flush_task = None
+
+    def start(self) -> None:
+        """Start the background flush task for sharded counters."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def shutdown(self) -> None:
+        """Stop the flush task and drain pending increments."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        self._flush_pending()
+
+    async def _flush_loop(self) -> None:
+        """Periodically drain the sharded accumulators."""
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                self._flush_pending()
+            except Exception:
+                pass
+
+    def _flush_pending(self) -> None:
+        """Drain accumulated increments into the real metrics.
+
+        One .inc(n) per distinct label tuple replaces n locked single
+        increments; histogram observations replay off the hot path.
+        """
+        if self._pending_counts:
+            counts, self._pending_counts = self._pending_counts, {}
+            for (agent_id, action_type, decision), n in counts.items():
+                _request_count(agent_id, action_type, decision).inc(n)
+        if self._pending_latencies:
+            latencies, self._pending_latencies = self._pending_latencies, {}
+            for action_type, values in latencies.items():
+                observe = _request_latency(action_type).observe
+                for value in values:
+                    observe(value)
+        if self._pending_risk_scores:
+            scores, self._pending_risk_scores = self._pending_risk_scores, {}
+            for action_type, values in scores.items():
+                observe = _risk_score(action_type).observe
+                for value in values:
+                    observe(value)
     
     def record_request(
         self,
@@ -153,14 +319,14 @@ class MetricsCollector:
         risk_score: float,
     ) -> None:
         """Record metrics for a processed request."""
-        REQUEST_COUNT.labels(
-            agent_id=agent_id,
-            action_type=action_type,
-            decision=decision,
-        ).inc()
-        
-        REQUEST_LATENCY.labels(action_type=action_type).observe(latency_seconds)
-        RISK_SCORE.labels(action_type=action_type).observe(risk_score)
+        key = (_bound_agent(agent_id), action_type, decision)
+        self._pending_counts[key] = self._pending_counts.get(key, 0) + 1
+        self._pending_latencies.setdefault(action_type, []).append(
+            latency_seconds
+        )
+        self._pending_risk_scores.setdefault(action_type, []).append(
+            risk_score
+        )
     
     def record_blocked_request(
         self,
@@ -168,12 +334,12 @@ class MetricsCollector:
         action_type: str,
         reason: str,
     ) -> None:
-        """Record a blocked request."""
-        BLOCKED_REQUESTS.labels(
-            agent_id=agent_id,
-            action_type=action_type,
-            reason=reason[:50],  # Truncate long reasons
-        ).inc()
+        """Record a blocked request.
+
+        Callers pass reasons already truncated to label length so the
+        same reason string hits the bound-child cache.
+        """
+        _blocked_requests(_bound_agent(agent_id), action_type, reason).inc()
     
     def record_approved_request(
         self,
@@ -181,10 +347,7 @@ class MetricsCollector:
         action_type: str,
     ) -> None:
         """Record an approved request."""
-        APPROVED_REQUESTS.labels(
-            agent_id=agent_id,
-            action_type=action_type,
-        ).inc()
+        _approved_requests(_bound_agent(agent_id), action_type).inc()
     
     def record_shadow_logged(
         self,
@@ -192,10 +355,7 @@ class MetricsCollector:
         action_type: str,
     ) -> None:
         """Record a shadow-logged request."""
-        SHADOW_LOGGED.labels(
-            agent_id=agent_id,
-            action_type=action_type,
-        ).inc()
+        _shadow_logged(_bound_agent(agent_id), action_type).inc()
     
     def record_high_risk_request(
         self,
@@ -204,11 +364,7 @@ class MetricsCollector:
         risk_level: str,
     ) -> None:
         """Record a high-risk request."""
-        HIGH_RISK_REQUESTS.labels(
-            agent_id=agent_id,
-            action_type=action_type,
-            risk_level=risk_level,
-        ).inc()
+        _high_risk_requests(_bound_agent(agent_id), action_type, risk_level).inc()
     
     def record_pii_detection(
         self,
@@ -216,9 +372,9 @@ class MetricsCollector:
         entity_types: list,
     ) -> None:
         """Record PII detection."""
-        REQUESTS_WITH_PII.labels(agent_id=agent_id).inc()
+        _requests_with_pii(_bound_agent(agent_id)).inc()
         for entity_type in entity_types:
-            PII_DETECTIONS.labels(entity_type=entity_type).inc()
+            _pii_detections(entity_type).inc()
     
     def record_policy_match(
         self,
@@ -226,10 +382,14 @@ class MetricsCollector:
         action_type: str,
     ) -> None:
         """Record a policy match."""
-        POLICY_MATCHES.labels(
-            rule_id=rule_id,
-            action_type=action_type,
-        ).inc()
+        _policy_matches(rule_id, action_type).inc()
+    
+    def record_pii_cache(self, hits: int, misses: int) -> None:
+        """Record PII sanitize-cache lookup outcomes, batched per call."""
+        if hits:
+            _PII_CACHE_HITS.inc(hits)
+        if misses:
+            _PII_CACHE_MISSES.inc(misses)
     
     def record_policy_evaluation_time(self, seconds: float) -> None:
         """Record policy evaluation time."""
@@ -245,11 +405,11 @@ class MetricsCollector:
     
     def record_rate_limited(self, agent_id: str) -> None:
         """Record a rate-limited request."""
-        RATE_LIMITED_REQUESTS.labels(agent_id=agent_id).inc()
+        _rate_limited_requests(_bound_agent(agent_id)).inc()
     
     def set_rate_limit_remaining(self, agent_id: str, remaining: int) -> None:
         """Update remaining rate limit for agent."""
-        RATE_LIMIT_REMAINING.labels(agent_id=agent_id).set(remaining)
+        _rate_limit_remaining(_bound_agent(agent_id)).set(remaining)
     
     def update_system_status(
         self,
@@ -269,7 +429,22 @@ class MetricsCollector:
     
     def generate_metrics(self) -> bytes:
         """Generate Prometheus metrics output."""
+        self._flush_pending()
         return generate_latest()
+
+    async def generate_metrics_cached(self) -> bytes:
+        """Serve the exposition payload from a short-lived snapshot."""
+        if time.monotonic() - self._cached_at < self._cache_ttl:
+            return self._cached_payload
+        async with self._cache_lock:
+            # Another scrape may have refreshed while we waited
+            if time.monotonic() - self._cached_at < self._cache_ttl:
+                return self._cached_payload
+            # Drain the sharded accumulators so the scrape sees current data
+            self._flush_pending()
+            self._cached_payload = generate_latest()
+            self._cached_at = time.monotonic()
+            return self._cached_payload
     
     def get_content_type(self) -> str:
         """Get Prometheus content type."""
@@ -291,27 +466,28 @@ def timed(metric_name: str = None) -> Callable:
     Usage: @timed("my_operation")
     """
     def decorator(func: Callable) -> Callable:
-        async def async_wrapper(*args, **kwargs):
-            start = time.perf_counter()
-            try:
-                return await func(*args, **kwargs)
-            finally:
-                elapsed = time.perf_counter() - start
-                if metric_name:
-                    REQUEST_LATENCY.labels(action_type=metric_name).observe(elapsed)
-        
-        def sync_wrapper(*args, **kwargs):
-            start = time.perf_counter()
-            try:
-                return func(*args, **kwargs)
-            finally:
-                elapsed = time.perf_counter() - start
-                if metric_name:
-                    REQUEST_LATENCY.labels(action_type=metric_name).observe(elapsed)
-        
-        import asyncio
+        if not metric_name:
+            return func
+
+        # Resolve the bound child once at decoration time; the hot call
+        # then skips both the label lookup and the name check.
+        observe = _request_latency(metric_name).observe
+
         if asyncio.iscoroutinefunction(func):
-            return async_wrapper
-        return sync_wrapper
-    
+            async def wrapper(*args, **kwargs):
+                start_ns = time.monotonic_ns()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    observe((time.monotonic_ns() - start_ns) * 1e-9)
+        else:
+            def wrapper(*args, **kwargs):
+                start_ns = time.monotonic_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    observe((time.monotonic_ns() - start_ns) * 1e-9)
+
+        return wrapper
+
     return decorator
@@ -2,19 +2,22 @@
 Sentinel Gateway Middleware.
 Authentication, structured logging, and request processing middleware.
 """
-import json
+import hashlib
+import hmac
 import logging
+import queue
+import re
 import sys
 import time
 import uuid
+from logging.handlers import QueueHandler, QueueListener
 from contextvars import ContextVar
 from datetime import datetime
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Dict, Optional
 
-from fastapi import HTTPException, Request, Response
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.types import ASGIApp
+import orjson
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config import Settings, get_settings
 from app.metrics import metrics_collector
@@ -24,6 +27,21 @@ from app.redis_client import redis_client
 request_id_ctx: ContextVar[str] = ContextVar("request_id", default="")
 agent_id_ctx: ContextVar[str] = ContextVar("agent_id", default="")
 
+# Bound lookups for the log-enrichment hot path; these only run for
+# records that passed the level check, and the binding skips one
+# attribute resolution per read.
+_get_request_id = request_id_ctx.get
+_get_agent_id = agent_id_ctx.get
+
+# How long a successful API-key validation may be served from the
+# in-process cache before the store is consulted again
+_AUTH_CACHE_TTL = 300.0
+
+
+def _key_digest(api_key: bytes) -> bytes:
+    """Fast fixed-size digest used as the validation-cache key."""
+    return hashlib.blake2b(api_key, digest_size=16).digest()
+
 
 class StructuredLogger:
     """
@@ -33,40 +51,58 @@ class StructuredLogger:
     def __init__(self, name: str, level: int = logging.INFO):
         self.logger = logging.getLogger(name)
         self.logger.setLevel(level)
-        
-        # Remove existing handlers
-        self.logger.handlers = []
-        
-        # Add JSON handler
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(JSONFormatter())
-        self.logger.addHandler(handler)
+        # Records propagate to the root logger configured by
+        # setup_structured_logging; attaching a handler here too would
+        # emit every record twice.
     
     def _enrich(self, extra: Dict[str, Any]) -> Dict[str, Any]:
-        """Enrich log with context variables."""
-        enriched = {
-            "request_id": request_id_ctx.get(""),
-            "agent_id": agent_id_ctx.get(""),
-            "timestamp": datetime.utcnow().isoformat(),
+        """Enrich log with context variables.
+
+        The record timestamp comes from JSONFormatter on the listener
+        thread, so no datetime work happens here on the hot path.
+        """
+        return {
             "service": "sentinel-gateway",
+            "request_id": _get_request_id(""),
+            "agent_id": _get_agent_id(""),
+            **extra,
         }
-        enriched.update(extra)
-        return enriched
+    
+    # Each level checks isEnabledFor before enriching so suppressed
+    # records (debug/info at WARNING) cost one method call, not a dict
+    # build plus two ContextVar reads.
     
     def info(self, message: str, **kwargs) -> None:
-        self.logger.info(message, extra={"extra": self._enrich(kwargs)})
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(message, extra={"extra": self._enrich(kwargs)})
     
     def warning(self, message: str, **kwargs) -> None:
-        self.logger.warning(message, extra={"extra": self._enrich(kwargs)})
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(message, extra={"extra": self._enrich(kwargs)})
     
     def error(self, message: str, **kwargs) -> None:
-        self.logger.error(message, extra={"extra": self._enrich(kwargs)})
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.error(message, extra={"extra": self._enrich(kwargs)})
     
     def debug(self, message: str, **kwargs) -> None:
-        self.logger.debug(message, extra={"extra": self._enrich(kwargs)})
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(message, extra={"extra": self._enrich(kwargs)})
     
     def critical(self, message: str, **kwargs) -> None:
-        self.logger.critical(message, extra={"extra": self._enrich(kwargs)})
+        if self.logger.isEnabledFor(logging.CRITICAL):
+            self.logger.critical(message, extra={"extra": self._enrich(kwargs)})
+    
+    def exception(self, message: str, **kwargs) -> None:
+        """Log at ERROR with the active exception's traceback attached.
+
+        The traceback is formatted once by JSONFormatter on the listener
+        thread, so callers don't need to stringify the exception
+        themselves.
+        """
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.error(
+                message, exc_info=True, extra={"extra": self._enrich(kwargs)}
+            )
 
 
 class JSONFormatter(logging.Formatter):
@@ -87,106 +123,265 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, "extra"):
             log_entry.update(record.extra)
         
-        # Add exception info if present
+        # Add exception info if present; cache the formatted traceback
+        # on the record (standard Formatter behavior) so it is built at
+        # most once even if several handlers format the same record
         if record.exc_info:
-            log_entry["exception"] = self.formatException(record.exc_info)
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            log_entry["exception"] = record.exc_text
         
-        return json.dumps(log_entry, default=str)
+        # orjson serializes datetimes and UUIDs natively, so default=str
+        # only fires for genuinely unknown values instead of per record
+        return orjson.dumps(log_entry, default=str).decode()
+
+
+# Listener thread that drains log records off the hot path; started by
+# setup_structured_logging and stopped by shutdown_structured_logging.
+_queue_listener: Optional[QueueListener] = None
+_logging_configured = False
+
+# Third-party loggers quieted at setup, resolved once so repeated
+# startup calls (hot reload, tests) don't re-walk the logger registry
+_NOISY_LOGGERS = (
+    logging.getLogger("uvicorn.access"),
+    logging.getLogger("httpx"),
+    logging.getLogger("httpcore"),
+)
 
 
 def setup_structured_logging(level: str = "INFO") -> None:
-    """Configure structured logging for the application."""
+    """Configure structured logging for the application.
+
+    Handlers attach behind a queue: request coroutines only enqueue the
+    record, and a single listener thread does the JSON formatting and
+    stdout write, so neither runs inside the event loop.
+
+    Idempotent: re-entry under hot reload or in tests reapplies the
+    level but does not stack another queue/listener pipeline, so each
+    record is written exactly once.
+    """
+    global _queue_listener, _logging_configured
     log_level = getattr(logging, level.upper(), logging.INFO)
-    
-    # Configure root logger
     root = logging.getLogger()
-    root.setLevel(log_level)
-    root.handlers = []
     
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JSONFormatter())
-    root.addHandler(handler)
+    if _logging_configured:
+        root.setLevel(log_level)
+        return
+    
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter())
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_listener = QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    _queue_listener.start()
+    
+    # Configure root logger, closing whatever handlers were installed
+    # before (e.g. basicConfig defaults) so they don't leak
+    root.setLevel(log_level)
+    old_handlers = root.handlers
+    root.handlers = [QueueHandler(log_queue)]
+    for handler in old_handlers:
+        handler.close()
     
     # Reduce noise from third-party libraries
-    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
-    logging.getLogger("httpx").setLevel(logging.WARNING)
-    logging.getLogger("httpcore").setLevel(logging.WARNING)
+    for noisy in _NOISY_LOGGERS:
+        noisy.setLevel(logging.WARNING)
+    
+    _logging_configured = True
+
+
+def shutdown_structured_logging() -> None:
+    """Stop the log listener thread, draining queued records."""
+    global _queue_listener, _logging_configured
+    if _queue_listener:
+        _queue_listener.stop()
+        _queue_listener = None
+    _logging_configured = False
 
 
 # Global structured logger
 structured_logger = StructuredLogger("sentinel")
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+# ==================== ASGI helpers ====================
+# The middlewares below speak raw ASGI instead of BaseHTTPMiddleware:
+# Starlette's base class spawns an anyio task group and wraps every
+# request/response in streaming objects, which costs a large share of
+# throughput on a compute-light gateway. Working on the scope and
+# message events directly avoids all of that per-request machinery.
+
+
+def _header_bytes(scope: Scope, name: bytes) -> Optional[bytes]:
+    """Fetch a single raw header value from the ASGI header list."""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+def _header_value(scope: Scope, name: bytes) -> str:
+    """Fetch a single header value, decoded."""
+    value = _header_bytes(scope, name)
+    return value.decode("latin-1") if value is not None else ""
+
+
+async def _send_json(send: Send, status_code: int, body: bytes) -> None:
+    """Emit a complete JSON response as raw ASGI messages."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def _prepare_json(body_dict: Dict[str, Any]) -> tuple:
+    """Serialize a fixed JSON body once, returning (headers, body).
+
+    Rejection responses are identical across requests; preparing them at
+    import/startup means a rejected request allocates nothing.
+    """
+    body = orjson.dumps(body_dict)
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    return headers, body
+
+
+async def _send_prepared(
+    send: Send, status_code: int, headers: list, body: bytes
+) -> None:
+    """Emit a prepared (headers, body) response as raw ASGI messages."""
+    await send(
+        {"type": "http.response.start", "status": status_code, "headers": headers}
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class RequestLoggingMiddleware:
     """
     Middleware for request/response logging with structured JSON output.
+
+    The dispatch variant is chosen once at startup: log level is frozen
+    configuration, so when INFO records can never be emitted the minimal
+    variant runs with access logging compiled out entirely instead of
+    testing the level on every request.
     """
     
     def __init__(self, app: ASGIApp, settings: Optional[Settings] = None):
-        super().__init__(app)
+        self.app = app
         self.settings = settings or get_settings()
+        level = getattr(
+            logging, self.settings.log_level.upper(), logging.INFO
+        )
+        self._call = self._call_full if level <= logging.INFO else self._call_minimal
     
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response:
-        # Generate request ID
-        request_id = str(uuid.uuid4())
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self._call(scope, receive, send)
+    
+    async def _call_full(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Request handling with one access-log record per request."""
+        # Propagate a client-supplied request ID, otherwise generate one.
+        # uuid4().hex skips the dashed __str__ formatting pass.
+        request_id = _header_value(scope, b"x-request-id") or uuid.uuid4().hex
         request_id_ctx.set(request_id)
         
-        # Add request ID to response headers
         start_time = time.perf_counter()
         
-        # Log request
-        structured_logger.info(
-            "Request received",
-            method=request.method,
-            path=request.url.path,
-            query=str(request.query_params),
-            client_ip=request.client.host if request.client else None,
-            user_agent=request.headers.get("user-agent"),
-        )
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                latency_ms = (time.perf_counter() - start_time) * 1000
+                message.setdefault("headers", []).extend(
+                    (
+                        (b"x-request-id", request_id.encode()),
+                        (b"x-processing-time-ms", f"{latency_ms:.2f}".encode()),
+                    )
+                )
+                client = scope.get("client")
+                structured_logger.info(
+                    "Request completed",
+                    method=scope["method"],
+                    path=scope["path"],
+                    query=scope.get("query_string", b"").decode("latin-1"),
+                    client_ip=client[0] if client else None,
+                    user_agent=_header_value(scope, b"user-agent") or None,
+                    status_code=message["status"],
+                    latency_ms=latency_ms,
+                )
+            await send(message)
         
         try:
-            response = await call_next(request)
-            
-            # Calculate latency
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
             latency_ms = (time.perf_counter() - start_time) * 1000
             
-            # Add headers
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Processing-Time-Ms"] = f"{latency_ms:.2f}"
-            
-            # Log response
-            structured_logger.info(
-                "Request completed",
-                status_code=response.status_code,
+            structured_logger.error(
+                "Request failed",
+                error=str(e),
+                error_type=type(e).__name__,
                 latency_ms=latency_ms,
             )
-            
-            return response
-            
+            raise
+    
+    async def _call_minimal(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Request handling without access logging: the request-ID
+        context and response headers are still maintained, and failures
+        are still logged."""
+        request_id = _header_value(scope, b"x-request-id") or uuid.uuid4().hex
+        request_id_ctx.set(request_id)
+        
+        start_time = time.perf_counter()
+        
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                latency_ms = (time.perf_counter() - start_time) * 1000
+                message.setdefault("headers", []).extend(
+                    (
+                        (b"x-request-id", request_id.encode()),
+                        (b"x-processing-time-ms", f"{latency_ms:.2f}".encode()),
+                    )
+                )
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            latency_ms = (time.perf_counter() - start_time) * 1000
-            
             structured_logger.error(
                 "Request failed",
                 error=str(e),
                 error_type=type(e).__name__,
-                latency_ms=latency_ms,
+                latency_ms=(time.perf_counter() - start_time) * 1000,
             )
             raise
 
 
-class AuthenticationMiddleware(BaseHTTPMiddleware):
+class AuthAndRateLimitMiddleware:
     """
-    API key authentication middleware for agent requests.
-    Validates Bearer tokens with agent_sk_ prefix.
+    Fused API key authentication + rate limiting middleware.
+
+    Authentication and rate limiting share the same public-path skip
+    check and the same agent identity, so running them as one ASGI
+    callable does the path test and header parse once and drops a
+    coroutine frame per request compared to two stacked middlewares.
+
+    Validates Bearer tokens with agent_sk_ prefix, then applies the
+    per-agent rate limit backed by Redis.
     """
     
-    # Endpoints that don't require authentication
-    PUBLIC_PATHS = {
+    # Endpoints that require neither authentication nor rate limiting
+    PUBLIC_PATHS = frozenset({
         "/",
         "/health",
         "/health/ready",
@@ -195,11 +390,85 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
         "/docs",
         "/openapi.json",
         "/redoc",
-    }
+    })
+    # Documentation prefixes, tested with one tuple-startswith call
+    PUBLIC_PREFIXES = ("/docs", "/redoc")
+    
+    # Rejection responses that don't depend on settings, built once
+    _UNAUTH_MISSING = _prepare_json(
+        {
+            "error": "unauthorized",
+            "message": "Missing or invalid Authorization header",
+            "detail": "Expected: Authorization: Bearer agent_sk_...",
+        }
+    )
+    _UNAUTH_INVALID = _prepare_json(
+        {
+            "error": "unauthorized",
+            "message": "Invalid API key",
+        }
+    )
     
     def __init__(self, app: ASGIApp, settings: Optional[Settings] = None):
-        super().__init__(app)
+        self.app = app
         self.settings = settings or get_settings()
+        # Settings are frozen; bind the per-request reads once. The
+        # prefix is kept as bytes so the hot path never decodes a header
+        # that is going to be rejected anyway.
+        self._key_prefix = self.settings.api_key_prefix
+        self._key_prefix_bytes = self._key_prefix.encode()
+        self._key_min_length = self.settings.api_key_min_length
+        # One precompiled bytes regex fuses the prefix, charset and
+        # length checks into a single C-level match with no decode.
+        self._key_re = re.compile(
+            rb"\A"
+            + re.escape(self._key_prefix_bytes)
+            + rb"[A-Za-z0-9_]{%d,}\Z"
+            % max(0, self._key_min_length - len(self._key_prefix_bytes))
+        )
+        # Successful validations cached by key digest so the hot path is
+        # one dict lookup; misses fall through to the constant-time scan
+        # below. Keeps per-request cost flat when _valid_keys moves to a
+        # database-backed store.
+        self._validation_cache: Dict[bytes, tuple] = {}
+        # Local token buckets keyed by agent: one Redis reservation hands
+        # out a batch of tokens, so most requests never leave the process.
+        # Tokens left over when a window rolls are forfeited, which only
+        # ever under-admits, never over-admits.
+        self._bucket_batch = self.settings.rate_limit_local_batch
+        self._local_buckets: Dict[str, tuple] = {}
+        # Settings-dependent rejection responses and rate-limit headers,
+        # prepared once (settings are frozen)
+        self._unauth_format = _prepare_json(
+            {
+                "error": "unauthorized",
+                "message": "Invalid API key format",
+                "detail": (
+                    f"API key must start with '{self._key_prefix}'"
+                    f" and be at least {self._key_min_length} characters"
+                ),
+            }
+        )
+        self._limit_header = (
+            b"x-ratelimit-limit",
+            str(self.settings.rate_limit_requests).encode(),
+        )
+        rl_headers, rl_body = _prepare_json(
+            {
+                "error": "rate_limit_exceeded",
+                "message": "Too many requests",
+                "retry_after": self.settings.rate_limit_window_seconds,
+            }
+        )
+        rl_headers = rl_headers + [
+            (
+                b"retry-after",
+                str(self.settings.rate_limit_window_seconds).encode(),
+            ),
+            self._limit_header,
+            (b"x-ratelimit-remaining", b"0"),
+        ]
+        self._rate_limited = (rl_headers, rl_body)
         # In production, these would come from a database
         self._valid_keys: Dict[str, Dict[str, Any]] = {
             "agent_sk_test_key_12345678901234567890": {
@@ -216,85 +485,132 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
             },
         }
     
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response:
-        # Skip auth for public paths
-        if request.url.path in self.PUBLIC_PATHS:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Skip auth for path prefixes
-        if request.url.path.startswith("/docs") or request.url.path.startswith("/redoc"):
-            return await call_next(request)
+        path = scope["path"]
         
-        # Extract API key from Authorization header
-        auth_header = request.headers.get("Authorization", "")
+        # Skip auth and rate limiting for public paths and path prefixes
+        if path in self.PUBLIC_PATHS or path.startswith(self.PUBLIC_PREFIXES):
+            await self.app(scope, receive, send)
+            return
         
-        if not auth_header.startswith("Bearer "):
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "error": "unauthorized",
-                    "message": "Missing or invalid Authorization header",
-                    "detail": "Expected: Authorization: Bearer agent_sk_...",
-                },
-            )
+        # ---- Authentication ----
+        # Extract API key from Authorization header, staying in bytes
+        # until the key is known to be well-formed
+        auth_header = _header_bytes(scope, b"authorization")
         
-        api_key = auth_header[7:]  # Remove "Bearer " prefix
+        if auth_header is None or not auth_header.startswith(b"Bearer "):
+            await _send_prepared(send, 401, *self._UNAUTH_MISSING)
+            return
         
-        # Validate key format
-        if not api_key.startswith(self.settings.api_key_prefix):
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "error": "unauthorized",
-                    "message": "Invalid API key format",
-                    "detail": f"API key must start with '{self.settings.api_key_prefix}'",
-                },
-            )
+        key_bytes = auth_header[7:]  # Remove "Bearer " prefix
         
-        if len(api_key) < self.settings.api_key_min_length:
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "error": "unauthorized",
-                    "message": "Invalid API key",
-                    "detail": "API key is too short",
-                },
-            )
+        # Validate key against store: cached digests first (a cache hit
+        # implies the key already passed the format check, so neither the
+        # regex nor the decode runs), then the precompiled format match,
+        # then a constant-time scan of the candidates so comparison
+        # timing leaks nothing about stored keys.
+        digest = _key_digest(key_bytes)
+        agent_info = None
+        cached = self._validation_cache.get(digest)
+        if cached and time.monotonic() - cached[1] < _AUTH_CACHE_TTL:
+            agent_info = cached[0]
+        else:
+            if not self._key_re.match(key_bytes):
+                await _send_prepared(send, 401, *self._unauth_format)
+                return
+            
+            # Only a plausible key pays for the decode
+            api_key = key_bytes.decode("latin-1")
+            for stored_key, info in self._valid_keys.items():
+                if hmac.compare_digest(api_key, stored_key):
+                    agent_info = info
+                    break
+            if agent_info:
+                if len(self._validation_cache) >= 4096:
+                    self._validation_cache.pop(
+                        next(iter(self._validation_cache))
+                    )
+                self._validation_cache[digest] = (agent_info, time.monotonic())
         
-        # Validate key against store
-        agent_info = self._valid_keys.get(api_key)
         if not agent_info:
             structured_logger.warning(
                 "Authentication failed",
                 reason="invalid_key",
-                key_prefix=api_key[:20] + "...",
-            )
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "error": "unauthorized",
-                    "message": "Invalid API key",
-                },
+                key_prefix=key_bytes[:20].decode("latin-1") + "...",
             )
+            await _send_prepared(send, 401, *self._UNAUTH_INVALID)
+            return
         
         # Set agent context
-        agent_id_ctx.set(agent_info["agent_id"])
+        agent_id = agent_info["agent_id"]
+        agent_id_ctx.set(agent_id)
         
-        # Store agent info in request state
-        request.state.agent_id = agent_info["agent_id"]
-        request.state.agent_name = agent_info["name"]
-        request.state.agent_permissions = agent_info["permissions"]
+        # Expose agent info as request state (Request.state reads this)
+        state = scope.setdefault("state", {})
+        state["agent_id"] = agent_id
+        state["agent_name"] = agent_info["name"]
+        state["agent_permissions"] = agent_info["permissions"]
         
         structured_logger.debug(
             "Authentication successful",
-            agent_id=agent_info["agent_id"],
+            agent_id=agent_id,
         )
         
-        return await call_next(request)
+        # ---- Rate limiting ----
+        # Serve from the local bucket when it still has tokens
+        bucket = self._local_buckets.get(agent_id)
+        now = time.monotonic()
+        if bucket and bucket[0] > 0 and now < bucket[2]:
+            tokens, remaining, expires_at = bucket
+            self._local_buckets[agent_id] = (tokens - 1, remaining - 1, expires_at)
+            is_allowed, remaining = True, remaining - 1
+        else:
+            # Reserve the next batch in one Redis round-trip
+            try:
+                granted, remaining, ttl = await redis_client.reserve_rate_limit(
+                    agent_id, self._bucket_batch
+                )
+            except Exception as e:
+                structured_logger.error(
+                    "Rate limiting error",
+                    error=str(e),
+                )
+                # Fail open on rate limit errors
+                await self.app(scope, receive, send)
+                return
+            
+            is_allowed = granted > 0
+            if is_allowed:
+                if len(self._local_buckets) >= 4096:
+                    self._local_buckets.pop(next(iter(self._local_buckets)))
+                self._local_buckets[agent_id] = (granted - 1, remaining, now + ttl)
+        
+        if not is_allowed:
+            metrics_collector.record_rate_limited(agent_id)
+            structured_logger.warning(
+                "Rate limit exceeded",
+                agent_id=agent_id,
+                remaining=remaining,
+            )
+            
+            await _send_prepared(send, 429, *self._rate_limited)
+            return
+        
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).extend(
+                    (
+                        self._limit_header,
+                        (b"x-ratelimit-remaining", str(remaining).encode()),
+                    )
+                )
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
     
     def register_api_key(
         self,
@@ -305,9 +621,10 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
         rate_limit: int = 1000,
     ) -> bool:
         """Register a new API key (for testing/admin purposes)."""
-        if not api_key.startswith(self.settings.api_key_prefix):
+        if not api_key.startswith(self._key_prefix):
             return False
         
+        self._validation_cache.pop(_key_digest(api_key.encode()), None)
         self._valid_keys[api_key] = {
             "agent_id": agent_id,
             "name": name,
@@ -317,123 +634,78 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
         return True
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class ErrorHandlingMiddleware:
     """
-    Rate limiting middleware using Redis.
+    Global error handling middleware.
+    Converts exceptions to structured JSON responses.
     """
     
-    EXCLUDED_PATHS = {"/", "/health", "/health/ready", "/health/live", "/metrics"}
-    
-    def __init__(self, app: ASGIApp, settings: Optional[Settings] = None):
-        super().__init__(app)
-        self.settings = settings or get_settings()
+    def __init__(self, app: ASGIApp):
+        self.app = app
     
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response:
-        # Skip rate limiting for excluded paths
-        if request.url.path in self.EXCLUDED_PATHS:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Get agent ID from context
-        agent_id = agent_id_ctx.get("")
-        if not agent_id:
-            return await call_next(request)
+        response_started = False
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
         
-        # Check rate limit
-        try:
-            is_allowed, remaining = await redis_client.check_rate_limit(agent_id)
-            
-            if not is_allowed:
-                metrics_collector.record_rate_limited(agent_id)
-                structured_logger.warning(
-                    "Rate limit exceeded",
-                    agent_id=agent_id,
-                    remaining=remaining,
-                )
-                
-                return JSONResponse(
-                    status_code=429,
-                    content={
-                        "error": "rate_limit_exceeded",
-                        "message": "Too many requests",
-                        "retry_after": self.settings.rate_limit_window_seconds,
-                    },
-                    headers={
-                        "Retry-After": str(self.settings.rate_limit_window_seconds),
-                        "X-RateLimit-Limit": str(self.settings.rate_limit_requests),
-                        "X-RateLimit-Remaining": "0",
-                    },
-                )
-            
-            # Process request
-            response = await call_next(request)
-            
-            # Add rate limit headers
-            response.headers["X-RateLimit-Limit"] = str(self.settings.rate_limit_requests)
-            response.headers["X-RateLimit-Remaining"] = str(remaining)
-            
-            return response
-            
-        except Exception as e:
-            structured_logger.error(
-                "Rate limiting error",
-                error=str(e),
-            )
-            # Fail open on rate limit errors
-            return await call_next(request)
-
-
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
-    """
-    Global error handling middleware.
-    Converts exceptions to structured JSON responses.
-    """
-    
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response:
         try:
-            return await call_next(request)
+            await self.app(scope, receive, send_wrapper)
             
         except HTTPException as e:
-            return JSONResponse(
-                status_code=e.status_code,
-                content={
-                    "error": "http_error",
-                    "message": e.detail,
-                    "status_code": e.status_code,
-                },
+            if response_started:
+                raise
+            await _send_json(
+                send,
+                e.status_code,
+                orjson.dumps(
+                    {
+                        "error": "http_error",
+                        "message": e.detail,
+                        "status_code": e.status_code,
+                    }
+                ),
             )
             
         except ValueError as e:
+            if response_started:
+                raise
             structured_logger.warning(
                 "Validation error",
                 error=str(e),
             )
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "error": "validation_error",
-                    "message": str(e),
-                },
+            await _send_json(
+                send,
+                400,
+                orjson.dumps(
+                    {
+                        "error": "validation_error",
+                        "message": str(e),
+                    }
+                ),
             )
             
-        except Exception as e:
-            structured_logger.error(
-                "Unhandled exception",
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "error": "internal_server_error",
-                    "message": "An unexpected error occurred",
-                    "request_id": request_id_ctx.get(""),
-                },
+        except Exception:
+            # The traceback carries the type and message; formatting it
+            # happens once, off-loop, on the log listener thread.
+            structured_logger.exception("Unhandled exception")
+            if response_started:
+                raise
+            await _send_json(
+                send,
+                500,
+                orjson.dumps(
+                    {
+                        "error": "internal_server_error",
+                        "message": "An unexpected error occurred",
+                        "request_id": request_id_ctx.get(""),
+                    }
+                ),
             )
@@ -2,13 +2,21 @@
 Sentinel Gateway Data Models.
 Pydantic models for request/response validation and internal data structures.
 """
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from enum import Enum
+from functools import partial
 from typing import Any, Dict, List, Optional
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field, field_validator
 
+# Bound once so default factories load a module global instead of
+# resolving attributes on every construction. Aware UTC: the audit
+# tables use timestamptz columns, and asyncpg interprets naive
+# datetimes in the process-local timezone when binding them.
+_utcnow = partial(datetime.now, timezone.utc)
+
 
 class ActionType(str, Enum):
     """Types of actions agents can request."""
@@ -46,7 +54,7 @@ class AgentRequest(BaseModel):
     target_resource: str = Field(..., min_length=1, max_length=512)
     parameters: Dict[str, Any] = Field(default_factory=dict)
     context: Dict[str, Any] = Field(default_factory=dict)
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
     
     @field_validator('parameters', 'context', mode='before')
     @classmethod
@@ -82,19 +90,29 @@ class PolicyRule(BaseModel):
         }
 
 
-class PolicyEvaluationResult(BaseModel):
+# PolicyEvaluationResult, ApprovalRequest and AuditLogEntry are internal
+# pipeline objects: they are built on every decision, never validated
+# against external input, and never appear in a response_model. As slots
+# dataclasses they skip pydantic's per-instance __dict__/__fields_set__
+# allocation, and orjson serializes them natively where needed.
+
+
+@dataclass(slots=True)
+class PolicyEvaluationResult:
     """Result of evaluating a request against policies."""
     request_id: UUID
     decision: DecisionType
-    risk_score: float = Field(ge=0.0, le=1.0)
-    risk_level: RiskLevel
-    matched_rules: List[str] = Field(default_factory=list)
-    denial_reasons: List[str] = Field(default_factory=list)
+    risk_score: float = 0.0
+    risk_level: RiskLevel = RiskLevel.LOW
+    matched_rules: List[str] = field(default_factory=list)
+    denial_reasons: List[str] = field(default_factory=list)
+    # None when no redaction happened (denied, or allowed with no PII);
+    # consumers must fall back to the original request payload.
     sanitized_request: Optional[Dict[str, Any]] = None
     pii_detected: bool = False
-    pii_fields: List[str] = Field(default_factory=list)
+    pii_fields: List[str] = field(default_factory=list)
     evaluation_time_ms: float = 0.0
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = field(default_factory=_utcnow)
 
 
 class GatewayResponse(BaseModel):
@@ -108,12 +126,12 @@ class GatewayResponse(BaseModel):
     approval_id: Optional[UUID] = None
     forwarded: bool = False
     response_data: Optional[Dict[str, Any]] = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
 
 
-class ApprovalRequest(BaseModel):
+@dataclass(slots=True)
+class ApprovalRequest:
     """Request sent to approval service for human-in-the-loop."""
-    approval_id: UUID = Field(default_factory=uuid4)
     request_id: UUID
     agent_id: str
     action_type: ActionType
@@ -123,7 +141,8 @@ class ApprovalRequest(BaseModel):
     matched_rules: List[str]
     sanitized_parameters: Dict[str, Any]
     context: Dict[str, Any]
-    requested_at: datetime = Field(default_factory=datetime.utcnow)
+    approval_id: UUID = field(default_factory=uuid4)
+    requested_at: datetime = field(default_factory=_utcnow)
     expires_at: Optional[datetime] = None
 
 
@@ -144,9 +163,9 @@ class ApprovalResponse(BaseModel):
     approved_at: Optional[datetime] = None
 
 
-class AuditLogEntry(BaseModel):
+@dataclass(slots=True)
+class AuditLogEntry:
     """Audit log entry for persistence."""
-    log_id: UUID = Field(default_factory=uuid4)
     request_id: UUID
     agent_id: str
     action_type: ActionType
@@ -163,7 +182,8 @@ class AuditLogEntry(BaseModel):
     processing_time_ms: float
     client_ip: Optional[str] = None
     user_agent: Optional[str] = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    log_id: UUID = field(default_factory=uuid4)
+    timestamp: datetime = field(default_factory=_utcnow)
 
 
 class HealthStatus(BaseModel):
@@ -174,7 +194,7 @@ class HealthStatus(BaseModel):
     redis_connected: bool
     postgres_connected: bool
     uptime_seconds: float
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
 
 
 class MetricsSummary(BaseModel):
@@ -2,17 +2,26 @@
 Sentinel Gateway Policy Engine.
 Dynamic policy evaluation with PII detection and sanitization.
 """
+import asyncio
 import copy
 import logging
 import re
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
 
 from presidio_analyzer import AnalyzerEngine, RecognizerResult
 from presidio_anonymizer import AnonymizerEngine
 from presidio_anonymizer.entities import OperatorConfig
 
-from app.config import GatewayMode, Settings, get_settings
+try:
+    # Optional: RE2's DFA matches in time linear in the input, immune to
+    # the backtracking blow-ups Python's re can hit on adversarial text
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
+from app.config import GatewayMode, Settings, get_gateway_mode, get_settings
+from app.metrics import metrics_collector
 from app.models import (
     ActionType,
     AgentRequest,
@@ -25,6 +34,40 @@ from app.redis_client import RedisClient, get_redis
 
 logger = logging.getLogger(__name__)
 
+# Fallback PII patterns fused into a single alternation and compiled
+# once: one C-level sub pass replaces every match, and the named group
+# that fired records the entity type. Order matters the way the old
+# sequential passes did: earlier alternatives win at a given position.
+_FALLBACK_PATTERNS = {
+    "EMAIL_ADDRESS": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    "US_SSN": r'\b\d{3}-\d{2}-\d{4}\b',
+    "PHONE_NUMBER": r'\b(?:\+1[-.]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b',
+    "CREDIT_CARD": r'\b(?:\d{4}[-\s]?){3}\d{4}\b',
+    "IP_ADDRESS": r'\b(?:\d{1,3}\.){3}\d{1,3}\b',
+}
+_FALLBACK_PATTERN = "|".join(
+    f"(?P<{name}>{pattern})" for name, pattern in _FALLBACK_PATTERNS.items()
+)
+_FALLBACK_RE = re.compile(_FALLBACK_PATTERN, re.IGNORECASE)
+
+# Prescan table for the fallback patterns: every non-email pattern needs
+# digits, so text without an @ or a short digit-ish run can skip the
+# regex entirely. ASCII digits and "." map to a marker byte ("." because
+# IP octets can be single digits, as in 1.2.3.4) and translate+find then
+# locate a three-marker run entirely in C.
+_PII_SCAN_TABLE = bytes(
+    0xFF if 0x30 <= i <= 0x39 or i == 0x2E else 0x00 for i in range(256)
+)
+_PII_SCAN_RUN = b"\xff\xff\xff"
+
+
+def _may_contain_pii(text: str) -> bool:
+    """Cheap C-level prescan for the fallback patterns."""
+    if "@" in text:
+        return True
+    encoded = text.encode("utf-8", "ignore")
+    return encoded.translate(_PII_SCAN_TABLE).find(_PII_SCAN_RUN) >= 0
+
 
 class PIISanitizer:
     """PII detection and sanitization using Microsoft Presidio."""
@@ -50,22 +93,94 @@ class PIISanitizer:
         self.entities = entities or self.DEFAULT_ENTITIES
         self._analyzer: Optional[AnalyzerEngine] = None
         self._anonymizer: Optional[AnonymizerEngine] = None
+        # One masking operator per entity, built once; the anonymizer
+        # only applies operators for entities present in the results, so
+        # the unused keys cost nothing per call.
+        self._operators = {
+            entity: OperatorConfig(
+                "mask", {"chars_to_mask": 8, "masking_char": "*"}
+            )
+            for entity in self.entities
+        }
+        settings = get_settings()
+        self._nlp_min_length = settings.pii_nlp_min_length
+        # The fused fallback pattern, optionally compiled with RE2 for
+        # linear-time scans of large strings (e.g. long model outputs).
+        # Any compile failure falls back to the stdlib engine.
+        self._fallback_re = _FALLBACK_RE
+        if settings.pii_fallback_re2 and _re2 is not None:
+            try:
+                self._fallback_re = _re2.compile(
+                    _FALLBACK_PATTERN, _re2.IGNORECASE
+                )
+            except Exception as e:
+                logger.warning(f"RE2 fallback compile failed, using re: {e}")
+        # Sanitized-text memoization: agent traffic repeats the same
+        # parameter strings heavily (endpoint paths, enum-like values,
+        # boilerplate context), and each repeat would otherwise re-run
+        # the full analysis. Detected types are stored as a tuple so a
+        # cached entry can never be mutated by a caller; oldest-insert
+        # eviction keeps the cache bounded.
+        self._text_cache: Dict[
+            Tuple[str, str], Tuple[str, Tuple[str, ...]]
+        ] = {}
         self._initialized = False
     
+    def _cache_store(
+        self,
+        key: Tuple[str, str],
+        result: Tuple[str, List[str]],
+    ) -> Tuple[str, List[str]]:
+        """Store a sanitize result and pass it through."""
+        if len(self._text_cache) >= 4096:
+            self._text_cache.pop(next(iter(self._text_cache)))
+        self._text_cache[key] = (result[0], tuple(result[1]))
+        return result
+    
+    def _needs_nlp(self, text: str) -> bool:
+        """Cheap pre-filter deciding whether a string warrants spaCy.
+
+        Numeric IDs, enum values, paths and other short single tokens
+        cannot contain the natural-language entities (PERSON etc.) the
+        NLP pass exists for, and the structured entities they might
+        carry (email, SSN, card, phone, IP) are all covered by the
+        regex patterns. Only multi-token or address-like strings of
+        plausible length pay for the model.
+        """
+        if len(text) < self._nlp_min_length:
+            return False
+        if " " not in text and "@" not in text and "-" not in text:
+            return False
+        return any(c.isalpha() for c in text)
+    
     def initialize(self) -> None:
         """Initialize Presidio engines (lazy loading for performance)."""
         if self._initialized:
             return
         
         try:
-            from presidio_analyzer.nlp_engine import NlpEngineProvider
+            import spacy
+            from presidio_analyzer.nlp_engine import SpacyNlpEngine
             
-            # Configure to use en_core_web_sm model
-            nlp_config = {
-                "nlp_engine_name": "spacy",
-                "models": [{"lang_code": "en", "model_name": "en_core_web_sm"}],
-            }
-            nlp_engine = NlpEngineProvider(nlp_configuration=nlp_config).create_engine()
+            class _LeanSpacyNlpEngine(SpacyNlpEngine):
+                """SpacyNlpEngine loading only the components Presidio
+                uses. The parser, lemmatizer and attribute ruler play no
+                part in PII detection; excluding them cuts per-doc CPU
+                and model memory. The tagger stays: SpacyRecognizer uses
+                POS tags for context scoring."""
+                
+                def load(self) -> None:
+                    self.nlp = {
+                        model["lang_code"]: spacy.load(
+                            model["model_name"],
+                            exclude=["parser", "lemmatizer", "attribute_ruler"],
+                        )
+                        for model in self.models
+                    }
+            
+            nlp_engine = _LeanSpacyNlpEngine(
+                models=[{"lang_code": "en", "model_name": "en_core_web_sm"}]
+            )
             
             self._analyzer = AnalyzerEngine(nlp_engine=nlp_engine)
             self._anonymizer = AnonymizerEngine()
@@ -99,96 +214,327 @@ class PIISanitizer:
         if not text or not isinstance(text, str):
             return text, []
         
-        if not self._analyzer or not self._anonymizer:
-            # Fallback to regex-based sanitization
-            return self._fallback_sanitize(text)
+        key = (text, language)
+        cached = self._text_cache.get(key)
+        if cached is not None:
+            metrics_collector.record_pii_cache(1, 0)
+            return cached[0], list(cached[1])
+        metrics_collector.record_pii_cache(0, 1)
+        
+        if not self._analyzer or not self._anonymizer or not self._needs_nlp(text):
+            # Regex-based sanitization: either the engines are
+            # unavailable, or the string can't contain NLP-only entities
+            return self._cache_store(key, self._fallback_sanitize(text))
         
         try:
             results = self.analyze(text, language)
-            
-            if not results:
-                return text, []
-            
-            # Get unique entity types
-            detected_types = list(set(r.entity_type for r in results))
-            
-            # Anonymize with masking
-            operators = {
-                entity: OperatorConfig("mask", {"chars_to_mask": 8, "masking_char": "*"})
-                for entity in detected_types
-            }
-            
-            anonymized = self._anonymizer.anonymize(
-                text=text,
-                analyzer_results=results,
-                operators=operators,
-            )
-            
-            return anonymized.text, detected_types
-            
+            return self._cache_store(key, self._apply_anonymizer(text, results))
         except Exception as e:
             logger.error(f"PII sanitization failed: {e}")
+            # Error-path results are not cached; the next call retries
             return self._fallback_sanitize(text)
     
+    def _apply_anonymizer(
+        self,
+        text: str,
+        results: List[RecognizerResult],
+    ) -> Tuple[str, List[str]]:
+        """Mask the analyzer findings in text.
+
+        Returns (sanitized_text, list_of_detected_entity_types).
+        """
+        if not results:
+            return text, []
+        
+        # Get unique entity types
+        detected_types = list(set(r.entity_type for r in results))
+        
+        # Anonymize with masking, reusing the prebuilt operators
+        anonymized = self._anonymizer.anonymize(
+            text=text,
+            analyzer_results=results,
+            operators=self._operators,
+        )
+        
+        return anonymized.text, detected_types
+    
+    def _sanitize_batch(
+        self,
+        texts: List[str],
+        language: str = "en",
+    ) -> List[Tuple[str, List[str]]]:
+        """Sanitize many strings with a single spaCy pipeline pass.
+
+        nlp.pipe (via the engine's process_batch) amortizes the per-call
+        model overhead across every string leaf of a request, and the
+        precomputed NlpArtifacts are handed to the analyzer so nothing
+        is tokenized twice. Falls back to per-string sanitize_text if
+        the batch pass fails.
+        """
+        if not self._analyzer or not self._anonymizer:
+            return [self._fallback_sanitize(t) for t in texts]
+        
+        # Partition: strings that can't contain NLP-only entities take
+        # the regex path; only the rest enter the spaCy batch
+        results: List[Optional[Tuple[str, List[str]]]] = [None] * len(texts)
+        nlp_indices: List[int] = []
+        nlp_texts: List[str] = []
+        hits = 0
+        for i, text in enumerate(texts):
+            cached = self._text_cache.get((text, language))
+            if cached is not None:
+                hits += 1
+                results[i] = (cached[0], list(cached[1]))
+            elif self._needs_nlp(text):
+                nlp_indices.append(i)
+                nlp_texts.append(text)
+            else:
+                results[i] = self._cache_store(
+                    (text, language), self._fallback_sanitize(text)
+                )
+        metrics_collector.record_pii_cache(hits, len(texts) - hits)
+        
+        if nlp_texts:
+            try:
+                artifacts = self._analyzer.nlp_engine.process_batch(
+                    nlp_texts, language=language
+                )
+                for i, (text, nlp_artifacts) in zip(nlp_indices, artifacts):
+                    results[i] = self._cache_store(
+                        (text, language),
+                        self._apply_anonymizer(
+                            text,
+                            self._analyzer.analyze(
+                                text=text,
+                                language=language,
+                                entities=self.entities,
+                                nlp_artifacts=nlp_artifacts,
+                            ),
+                        ),
+                    )
+            except Exception as e:
+                logger.error(f"Batched PII analysis failed: {e}")
+                for i in nlp_indices:
+                    results[i] = self.sanitize_text(texts[i], language)
+        
+        return results
+    
     def _fallback_sanitize(self, text: str) -> Tuple[str, List[str]]:
-        """Fallback regex-based PII sanitization."""
-        detected = []
-        sanitized = text
+        """Fallback regex-based PII sanitization.
+
+        A single pass over the fused pattern replaces every hit instead
+        of one search+sub walk per entity type; text the prescan rules
+        out never reaches the regex engine at all.
+        """
+        if not _may_contain_pii(text):
+            return text, []
         
-        patterns = {
-            "EMAIL_ADDRESS": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            "US_SSN": r'\b\d{3}-\d{2}-\d{4}\b',
-            "PHONE_NUMBER": r'\b(?:\+1[-.]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b',
-            "CREDIT_CARD": r'\b(?:\d{4}[-\s]?){3}\d{4}\b',
-            "IP_ADDRESS": r'\b(?:\d{1,3}\.){3}\d{1,3}\b',
-        }
+        detected = set()
         
-        for entity_type, pattern in patterns.items():
-            if re.search(pattern, sanitized, re.IGNORECASE):
-                detected.append(entity_type)
-                sanitized = re.sub(pattern, "[REDACTED]", sanitized, flags=re.IGNORECASE)
+        def _redact(match: re.Match) -> str:
+            detected.add(match.lastgroup)
+            return "[REDACTED]"
         
-        return sanitized, detected
+        sanitized = self._fallback_re.sub(_redact, text)
+        return sanitized, list(detected)
     
     def sanitize_dict(
         self,
         data: Dict[str, Any],
         language: str = "en",
-    ) -> Tuple[Dict[str, Any], List[str]]:
+    ) -> Tuple[Dict[str, Any], Set[str]]:
         """
-        Recursively sanitize PII from a dictionary.
-        Returns (sanitized_dict, list_of_all_detected_entity_types).
+        Sanitize PII from a dictionary, recursively.
+        Returns (sanitized_dict, set_of_all_detected_entity_types).
         """
-        all_detected = []
-        sanitized = self._sanitize_recursive(data, all_detected, language)
-        return sanitized, list(set(all_detected))
+        return self.sanitize_dicts([data], language)[0]
     
-    def _sanitize_recursive(
+    def sanitize_dicts(
         self,
-        data: Any,
-        detected: List[str],
-        language: str,
-    ) -> Any:
-        """Recursively process and sanitize data structures."""
-        if isinstance(data, str):
-            sanitized, types = self.sanitize_text(data, language)
-            detected.extend(types)
-            return sanitized
+        dicts: List[Dict[str, Any]],
+        language: str = "en",
+    ) -> List[Tuple[Dict[str, Any], Set[str]]]:
+        """Sanitize several dictionaries with one batched pipeline pass.
+
+        All string leaves across every input share a single
+        _sanitize_batch call, so spaCy's per-invocation overhead is paid
+        once for the whole group. Results align with the input order.
+        Untouched subtrees are shared with the inputs via copy-on-write,
+        and a no-PII dict comes back as-is with zero allocation.
+        """
+        per_leaves = [self._collect_leaves(data) for data in dicts]
+        texts = [text for leaves in per_leaves for _, text in leaves]
+        if not texts:
+            return [(data, set()) for data in dicts]
         
-        elif isinstance(data, dict):
-            return {
-                key: self._sanitize_recursive(value, detected, language)
-                for key, value in data.items()
-            }
+        results = self._sanitize_batch(texts, language)
         
-        elif isinstance(data, list):
-            return [
-                self._sanitize_recursive(item, detected, language)
-                for item in data
-            ]
+        out: List[Tuple[Dict[str, Any], Set[str]]] = []
+        pos = 0
+        for data, leaves in zip(dicts, per_leaves):
+            chunk = results[pos:pos + len(leaves)]
+            pos += len(leaves)
+            out.append(self._splice(data, leaves, chunk))
+        return out
+    
+    @staticmethod
+    def _collect_leaves(data: Any) -> List[Tuple[Tuple[Any, ...], str]]:
+        """Collect (path, text) for every non-empty string leaf.
+
+        Iterative walk with exact type() checks instead of isinstance:
+        requests arrive as JSON, so the values are always plain
+        str/dict/list, and the identity test skips the MRO walk on every
+        leaf touch. (Subclasses would be treated as opaque scalars.)
+        """
+        leaves: List[Tuple[Tuple[Any, ...], str]] = []
+        stack: List[Tuple[Tuple[Any, ...], Any]] = [((), data)]
+        while stack:
+            path, node = stack.pop()
+            items = node.items() if type(node) is dict else enumerate(node)
+            for key, value in items:
+                value_type = type(value)
+                if value_type is str:
+                    if value:
+                        leaves.append((path + (key,), value))
+                elif value_type is dict or value_type is list:
+                    stack.append((path + (key,), value))
+        return leaves
+    
+    @staticmethod
+    def _splice(
+        data: Any,
+        leaves: List[Tuple[Tuple[Any, ...], str]],
+        results: List[Tuple[str, List[str]]],
+    ) -> Tuple[Any, Set[str]]:
+        """Write sanitize results back copy-on-write.
+
+        A container is shallow-copied at most once, and only when
+        something beneath it changed; everything untouched is shared
+        with the input, and the input itself is never mutated.
+        """
+        all_detected: Set[str] = set()
+        sanitized = data
+        copies: Dict[int, Any] = {}
+        for (path, original), (replacement, types) in zip(leaves, results):
+            all_detected.update(types)
+            if replacement == original:
+                continue
+            if sanitized is data:
+                sanitized = copy.copy(data)
+            node = sanitized
+            parent = data
+            for key in path[:-1]:
+                child = parent[key]
+                copied_child = copies.get(id(child))
+                if copied_child is None:
+                    copied_child = copy.copy(child)
+                    copies[id(child)] = copied_child
+                node[key] = copied_child
+                node = copied_child
+                parent = child
+            node[path[-1]] = replacement
         
-        else:
-            return data
+        return sanitized, all_detected
+
+
+class _SanitizeBatcher:
+    """Micro-batches concurrent sanitize calls around one pipeline pass.
+
+    Under concurrent load every evaluate() used to run its own spaCy
+    batch, paying the model's per-invocation overhead once per request.
+    In-flight callers now deposit their dicts on a queue and await a
+    future; a single drainer task collects whatever arrives within a
+    couple of milliseconds and sanitizes the whole group through
+    sanitize_dicts, so the overhead is amortized across requests. With
+    no concurrency the only cost is the sub-window wait.
+    """
+    
+    _MAX_BATCH = 64
+    _WINDOW_SECONDS = 0.002
+    
+    def __init__(self, sanitizer: PIISanitizer):
+        self._sanitizer = sanitizer
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start the drainer task (requires a running loop)."""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._drain_loop())
+    
+    async def shutdown(self) -> None:
+        """Stop the drainer task."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._queue = None
+    
+    async def submit(
+        self, data: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Set[str]]:
+        """Sanitize one dict as part of the next micro-batch."""
+        if self._queue is None:
+            # Batcher not running (startup, tests): sanitize directly
+            return await asyncio.to_thread(
+                self._sanitizer.sanitize_dict, data
+            )
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((data, future))
+        return await future
+    
+    async def _drain_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._WINDOW_SECONDS
+            while len(batch) < self._MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                results = await asyncio.to_thread(
+                    self._sanitizer.sanitize_dicts,
+                    [data for data, _ in batch],
+                )
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    if not future.done():
+                        future.cancel()
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+class _FastRule(NamedTuple):
+    """Compact hot-path view of a PolicyRule.
+
+    The evaluation loop touches rule attributes on every request; plain
+    tuple access avoids pydantic's model machinery there. Enabled state
+    and action types are not carried: the index already filters on both
+    when it is built. Full PolicyRule objects remain the API-facing
+    representation.
+    """
+    rule_id: str
+    name: str
+    conditions: Dict[str, Any]
+    modifier: float
 
 
 class PolicyEngine:
@@ -206,16 +552,109 @@ class PolicyEngine:
         self.settings = settings or get_settings()
         self.pii_sanitizer = PIISanitizer()
         self._default_policies: List[PolicyRule] = []
+        # Discrimination index built by compile(): action type -> enabled
+        # candidate rules in priority order, so evaluation touches only
+        # the rules that can match instead of scanning every policy.
+        self._policy_index: Optional[Dict[ActionType, Tuple[_FastRule, ...]]] = None
+        self._index_expires: float = 0.0
+        # Short-TTL read cache in front of Redis for the management read
+        # endpoints: repeated polls of the same rule (or the full list)
+        # collapse to zero round-trips. Writes invalidate locally; other
+        # workers converge within the TTL.
+        self._read_cache_ttl = self.settings.policy_read_cache_ttl
+        self._policy_cache: Dict[str, Tuple[float, Optional[PolicyRule]]] = {}
+        self._all_policies_cache: Optional[Tuple[float, List[PolicyRule]]] = None
+        self._invalidation_task: Optional[asyncio.Task] = None
+        self._sanitize_batcher = _SanitizeBatcher(self.pii_sanitizer)
         self._initialized = False
-    
+
     async def initialize(self, redis_client: RedisClient) -> None:
         """Initialize the policy engine."""
         self.redis = redis_client
         self.pii_sanitizer.initialize()
         await self._load_default_policies()
+        await self.compile()
+        # Writes on any worker publish an invalidation; this listener
+        # drops the local caches so the next read refetches, giving
+        # near-immediate propagation instead of waiting out the TTL.
+        self._invalidation_task = asyncio.create_task(
+            self._watch_invalidations()
+        )
+        self._sanitize_batcher.start()
         self._initialized = True
         logger.info("Policy Engine initialized")
     
+    async def shutdown(self) -> None:
+        """Stop the invalidation listener and the sanitize batcher."""
+        await self._sanitize_batcher.shutdown()
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
+    
+    def _drop_local_caches(self) -> None:
+        """Invalidate every in-process policy read cache."""
+        self._policy_cache.clear()
+        self._all_policies_cache = None
+        self._index_expires = 0.0
+    
+    async def _watch_invalidations(self) -> None:
+        """Listen for policy invalidations published by other workers."""
+        while True:
+            try:
+                await self.redis.listen_policy_invalidations(
+                    self._drop_local_caches
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Policy invalidation listener error: {e}")
+                await asyncio.sleep(5)
+
+    @staticmethod
+    def _build_policy_index(
+        policies: List[PolicyRule],
+    ) -> Dict[ActionType, Tuple[_FastRule, ...]]:
+        """Group enabled policies by action type, priority-ordered.
+
+        Rules are stored as _FastRule tuples so the per-request loop
+        never touches the pydantic models.
+        """
+        index: Dict[ActionType, List[_FastRule]] = {}
+        for policy in sorted(policies, key=lambda p: p.priority):
+            if not policy.enabled:
+                continue
+            conditions = policy.conditions
+            tables = conditions.get("protected_tables")
+            if tables:
+                # Static per policy: lowercase once here instead of per
+                # table per request in the hot loop
+                conditions = dict(conditions)
+                conditions["protected_tables"] = tuple(
+                    t.lower() for t in tables
+                )
+            fast = _FastRule(
+                policy.rule_id,
+                policy.name,
+                conditions,
+                policy.risk_score_modifier,
+            )
+            for action_type in policy.action_types:
+                index.setdefault(action_type, []).append(fast)
+        return {action: tuple(rules) for action, rules in index.items()}
+
+    async def compile(self) -> None:
+        """(Re)build the action-type index from the active policies."""
+        policies = await self.get_active_policies()
+        self._policy_index = self._build_policy_index(policies)
+        # Policy writes on other workers only reach this process through
+        # Redis, so the index re-compiles after the read-cache TTL
+        self._index_expires = time.monotonic() + self._read_cache_ttl
+        logger.debug(f"Compiled policy index for {len(self._policy_index)} action types")
+    
     async def _load_default_policies(self) -> None:
         """Load default policies if none exist in cache."""
         self._default_policies = [
@@ -285,9 +724,15 @@ class PolicyEngine:
     
     async def get_active_policies(self) -> List[PolicyRule]:
         """Get all active policies from cache."""
+        cached = self._all_policies_cache
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
         if self.redis:
             policies = await self.redis.get_all_policies()
             if policies:
+                self._all_policies_cache = (
+                    time.monotonic() + self._read_cache_ttl, policies
+                )
                 return policies
         return self._default_policies
     
@@ -301,7 +746,9 @@ class PolicyEngine:
         """
         start_time = time.perf_counter()
         
-        # Initialize result
+        # Initialize result. PolicyEvaluationResult is a slots dataclass,
+        # so construction is a plain allocation; only AgentRequest, which
+        # crosses the network boundary, pays for pydantic validation.
         result = PolicyEvaluationResult(
             request_id=request.request_id,
             decision=DecisionType.ALLOW,
@@ -314,62 +761,81 @@ class PolicyEngine:
         )
         
         try:
-            # Step 1: Sanitize PII from request
-            sanitized_params, pii_fields = self.pii_sanitizer.sanitize_dict(
-                request.parameters
-            )
-            sanitized_context, context_pii = self.pii_sanitizer.sanitize_dict(
-                request.context
-            )
-            
-            all_pii_fields = list(set(pii_fields + context_pii))
-            result.pii_detected = len(all_pii_fields) > 0
-            result.pii_fields = all_pii_fields
-            result.sanitized_request = {
-                "parameters": sanitized_params,
-                "context": sanitized_context,
-                "agent_id": request.agent_id,
-                "action_type": request.action_type.value,
-                "target_resource": request.target_resource,
-            }
-            
-            if result.pii_detected:
-                logger.info(
-                    f"PII detected in request {request.request_id}: {all_pii_fields}"
-                )
-            
-            # Step 2: Get active policies
-            policies = await self.get_active_policies()
-            
-            # Step 3: Evaluate each policy
+            # Step 1: Candidate policies from the compiled index,
+            # re-compiled once per TTL window so policy writes made by
+            # other workers converge without a per-request Redis read
+            if self._policy_index is None or time.monotonic() >= self._index_expires:
+                await self.compile()
+            candidates = self._policy_index.get(request.action_type, ())
+
+            # Step 2: Evaluate each candidate policy against the raw
+            # request. No condition consumes sanitized text (amounts,
+            # row counts, target resource, justification), so running
+            # the cheap checks first is equivalent -- and lets a
+            # guaranteed deny skip the NLP work entirely.
             cumulative_risk = 0.0
-            
-            for policy in policies:
-                if not policy.enabled:
-                    continue
-                
-                if request.action_type not in policy.action_types:
-                    continue
-                
+
+            for policy in candidates:
                 # Evaluate policy conditions
                 violation, reason = self._evaluate_conditions(
-                    policy, request, sanitized_params
+                    policy, request, request.parameters
                 )
                 
                 if violation:
                     result.matched_rules.append(policy.rule_id)
                     result.denial_reasons.append(reason)
-                    cumulative_risk += policy.risk_score_modifier
+                    cumulative_risk += policy.modifier
             
-            # Step 4: Calculate final risk score (clamped to 0-1)
+            # Step 3: Calculate final risk score (clamped to 0-1)
             result.risk_score = min(1.0, max(0.0, cumulative_risk))
             
-            # Step 5: Determine risk level
+            # Step 4: Determine risk level
             result.risk_level = self._calculate_risk_level(result.risk_score)
             
-            # Step 6: Determine decision based on risk score and mode
+            # Step 5: Determine decision based on risk score and mode
             result.decision = self._determine_decision(result.risk_score)
             
+            # Step 6: Sanitize PII unless the request is already denied:
+            # a denied request is never forwarded, so nothing downstream
+            # consumes the sanitized payload. The batcher coalesces both
+            # dicts -- and any concurrently evaluating requests -- into
+            # one pipeline pass on a worker thread, keeping the event
+            # loop free while the model runs.
+            if result.decision != DecisionType.DENY:
+                (sanitized_params, pii_fields), (
+                    sanitized_context,
+                    context_pii,
+                ) = await asyncio.gather(
+                    self._sanitize_batcher.submit(request.parameters),
+                    self._sanitize_batcher.submit(request.context),
+                )
+                
+                # Both sources are already sets; one union, one list build
+                all_pii_fields = list(pii_fields | context_pii)
+                result.pii_detected = len(all_pii_fields) > 0
+                result.pii_fields = all_pii_fields
+                # On the common path -- allowed, nothing redacted -- the
+                # sanitized payload is byte-for-byte the original request,
+                # so sanitized_request stays None and consumers fall back
+                # to the raw payload (the audit writer and the approval
+                # flow both already tolerate this; denials leave it None
+                # too). The wrapper dict is only built when it would
+                # actually differ or when a non-ALLOW decision means
+                # downstream wants the redacted form explicitly.
+                if result.pii_detected or result.decision != DecisionType.ALLOW:
+                    result.sanitized_request = {
+                        "parameters": sanitized_params,
+                        "context": sanitized_context,
+                        "agent_id": request.agent_id,
+                        "action_type": request.action_type.value,
+                        "target_resource": request.target_resource,
+                    }
+                
+                if result.pii_detected:
+                    logger.info(
+                        f"PII detected in request {request.request_id}: {all_pii_fields}"
+                    )
+            
         except Exception as e:
             logger.error(f"Policy evaluation error: {e}")
             result.decision = DecisionType.DENY
@@ -385,9 +851,9 @@ class PolicyEngine:
     
     def _evaluate_conditions(
         self,
-        policy: PolicyRule,
+        policy: _FastRule,
         request: AgentRequest,
-        sanitized_params: Dict[str, Any],
+        params: Dict[str, Any],
     ) -> Tuple[bool, str]:
         """
         Evaluate policy conditions against request.
@@ -397,26 +863,26 @@ class PolicyEngine:
         
         # Check max_amount condition
         if "max_amount" in conditions:
-            amount = sanitized_params.get("amount", 0)
+            amount = params.get("amount", 0)
             if isinstance(amount, (int, float)) and amount > conditions["max_amount"]:
                 return True, (
                     f"Amount ${amount} exceeds limit of ${conditions['max_amount']} "
                     f"({policy.name})"
                 )
         
-        # Check protected tables
+        # Check protected tables (pre-lowercased at index build)
         if "protected_tables" in conditions:
             target = request.target_resource.lower()
             for table in conditions["protected_tables"]:
-                if table.lower() in target:
+                if table in target:
                     return True, (
                         f"Access to protected resource '{table}' ({policy.name})"
                     )
         
         # Check bulk operation limits
         if "max_affected_rows" in conditions:
-            affected = sanitized_params.get("affected_rows", 0)
-            limit = sanitized_params.get("limit", 0)
+            affected = params.get("affected_rows", 0)
+            limit = params.get("limit", 0)
             count = max(affected, limit)
             if count > conditions["max_affected_rows"]:
                 return True, (
@@ -453,7 +919,7 @@ class PolicyEngine:
         """Determine decision based on risk score and gateway mode."""
         # Block if risk is at maximum
         if risk_score >= self.settings.risk_score_block_threshold:
-            if self.settings.gateway_mode == GatewayMode.SHADOW:
+            if get_gateway_mode() == GatewayMode.SHADOW:
                 return DecisionType.SHADOW_LOGGED
             return DecisionType.DENY
         
@@ -463,22 +929,64 @@ class PolicyEngine:
         
         return DecisionType.ALLOW
     
+    async def evaluate_and_decide(
+        self,
+        request: AgentRequest,
+        circuit_breaker,
+    ) -> Tuple[PolicyEvaluationResult, Any]:
+        """Fused evaluate + circuit-breaker pass.
+
+        Runs policy evaluation and feeds the result straight into the
+        breaker, so the request handler awaits one coroutine instead of
+        scheduling two back to back.
+        """
+        evaluation = await self.evaluate(request)
+        response = await circuit_breaker.process(request, evaluation)
+        return evaluation, response
+
+    def _invalidate_read_cache(self, rule_id: str) -> None:
+        """Drop cached reads touched by a policy write."""
+        self._policy_cache.pop(rule_id, None)
+        self._all_policies_cache = None
+
     async def add_policy(self, policy: PolicyRule) -> bool:
         """Add or update a policy in the cache."""
         if self.redis:
-            return await self.redis.store_policy(policy)
+            stored = await self.redis.store_policy(policy)
+            if stored:
+                self._invalidate_read_cache(policy.rule_id)
+                await self.compile()
+                await self.redis.publish_policy_invalidation()
+            return stored
         return False
-    
+
     async def remove_policy(self, rule_id: str) -> bool:
         """Remove a policy from the cache."""
         if self.redis:
-            return await self.redis.delete_policy(rule_id)
+            removed = await self.redis.delete_policy(rule_id)
+            if removed:
+                self._invalidate_read_cache(rule_id)
+                await self.compile()
+                await self.redis.publish_policy_invalidation()
+            return removed
         return False
     
     async def get_policy(self, rule_id: str) -> Optional[PolicyRule]:
         """Get a specific policy by ID."""
+        cached = self._policy_cache.get(rule_id)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
         if self.redis:
-            return await self.redis.get_policy(rule_id)
+            policy = await self.redis.get_policy(rule_id)
+            if len(self._policy_cache) >= 1024:
+                # Oldest-insert eviction keeps the cache bounded without
+                # tracking access order; the TTL handles freshness.
+                self._policy_cache.pop(next(iter(self._policy_cache)))
+            # Misses are cached too: 404 polls are the hottest case
+            self._policy_cache[rule_id] = (
+                time.monotonic() + self._read_cache_ttl, policy
+            )
+            return policy
         
         for policy in self._default_policies:
             if policy.rule_id == rule_id:
@@ -2,59 +2,267 @@
 Sentinel Gateway Redis Client.
 Handles policy caching, rate limiting, and session management.
 """
-import json
+import asyncio
 import logging
+import time
+from collections import Counter
 from typing import Any, Dict, List, Optional
+from uuid import uuid4
 
+import numpy as np
+import orjson
 import redis.asyncio as redis
 from redis.asyncio.connection import ConnectionPool
+from redis.exceptions import NoScriptError
 
 from app.config import Settings, get_settings
 from app.models import PolicyRule
 
 logger = logging.getLogger(__name__)
 
+# Pending approvals are bucketed into per-day HASH keys so Redis tracks one
+# TTL per bucket instead of one key + TTL structure per approval. The
+# bucket TTL counts from the bucket's first write, so it must cover the
+# worst case: an approval stored at the very end of the bucket still
+# needs its full 24h window (bucket length + window, plus an hour slack).
+_APPROVAL_BUCKET_SECONDS = 86400
+_APPROVAL_BUCKET_TTL = 2 * 86400 + 3600  # 49h
+_APPROVAL_BUCKET_PREFIX = "sentinel:approvals:"
+_APPROVAL_LEGACY_PREFIX = "sentinel:approval:"
+
+# Channel used to tell other workers their local policy caches are stale
+_POLICY_INVALIDATION_CHANNEL = "sentinel:policies:invalidate"
+
+# Policies fetched per HSCAN round-trip when loading the full set
+_POLICY_SCAN_BATCH = 500
+
+# Latency tracking: a t-digest sketch when the server provides one
+# (Redis Stack), otherwise the capped list. The sketch records and
+# queries percentiles in constant space and never ships raw samples
+# over the wire.
+_LATENCY_LIST_KEY = "sentinel:metrics:latencies"
+_LATENCY_TDIGEST_KEY = "sentinel:metrics:latencies:td"
+_LATENCY_TDIGEST_COMPRESSION = 100
+
+# Latency samples are queued in-process and flushed by a background task
+# so the request path never awaits telemetry writes
+_LATENCY_QUEUE_SIZE = 10_000
+_LATENCY_FLUSH_BATCH = 512
+
+# Metric counters accumulate in-process and drain into one HASH on a
+# short interval; a high-QPS counter costs one HINCRBY per flush instead
+# of one round-trip per increment
+_METRICS_HASH_KEY = "sentinel:metrics"
+_METRICS_FLUSH_INTERVAL = 0.1
+
+# Connectivity heartbeat: a background task pings once a second and
+# health checks read the cached result instead of paying a round-trip
+# per probe
+_HEARTBEAT_INTERVAL = 1.0
+_HEARTBEAT_FRESH_SECONDS = 2.0
+
+# Sliding-window rate limiter in one server-side step. A fixed-window
+# counter admits up to 2x the limit across a window boundary (a burst at
+# the end of one window plus a burst at the start of the next); the sorted
+# set keyed by request timestamp enforces a true rolling window. Expired
+# members are trimmed, the remaining count is compared against the limit,
+# and up to ARGV[4] tokens are granted by inserting members scored with
+# the current time. ARGV[5] is a per-call unique member base so concurrent
+# grants never collide. Key expiry trails the window so idle agents cost
+# nothing. All times are milliseconds.
+_RATE_LIMIT_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local want = tonumber(ARGV[4])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local used = redis.call('ZCARD', KEYS[1])
+local grant = limit - used
+if grant > want then grant = want end
+if grant < 0 then grant = 0 end
+for i = 1, grant do
+    redis.call('ZADD', KEYS[1], now, ARGV[5] .. ':' .. i)
+end
+if grant > 0 then
+    redis.call('PEXPIRE', KEYS[1], window + 60000)
+end
+local remaining = limit - used - grant
+if remaining < 0 then remaining = 0 end
+return {grant, remaining}
+"""
+
+# Server-side scripts by name; loaded once at connect, invoked by SHA
+_SCRIPTS = {
+    "rate_limit": _RATE_LIMIT_LUA,
+}
+
 
 class RedisClient:
     """Async Redis client for caching and rate limiting."""
     
     def __init__(self, settings: Optional[Settings] = None):
         self.settings = settings or get_settings()
+        # Hot-path keys and prefixes, built once: per-call keys become a
+        # single str concat instead of a run of the f-string formatter
+        self._rate_limit_prefix = self.settings.redis_rate_limit_prefix
+        # Key of the HASH holding every cached policy by rule_id
+        self._policy_hash_key = f"{self.settings.redis_policy_prefix}all"
+        # Counter bumped by every policy mutation; gates the local cache
+        self._policy_version_key = f"{self.settings.redis_policy_prefix}version"
         self._pool: Optional[ConnectionPool] = None
         self._client: Optional[redis.Redis] = None
+        self._last_approval_bucket = -1
+        # name -> SHA of every registered server-side script
+        self._scripts: Dict[str, str] = {}
+        # (version, policies) pair valid while the Redis-held version
+        # counter still matches; see get_all_policies.
+        self._policies_cache: Optional[tuple[int, List[PolicyRule]]] = None
+        self._policies_lock = asyncio.Lock()
+        self._tdigest_available = False
+        self._latency_queue: Optional[asyncio.Queue] = None
+        self._latency_task: Optional[asyncio.Task] = None
+        self._metric_buf: Counter = Counter()
+        self._metrics_task: Optional[asyncio.Task] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._last_ping_ok = False
+        self._last_ping_ts = 0.0
     
     async def connect(self) -> None:
         """Establish connection to Redis."""
         try:
+            # Raw bytes responses: every hot consumer either parses with
+            # orjson (which takes bytes natively, skipping the UTF-8
+            # decode and intermediate str) or converts numerics with
+            # int()/float(), which accept bytes directly.
             self._pool = ConnectionPool.from_url(
                 self.settings.redis_url,
-                max_connections=50,
-                decode_responses=True
+                max_connections=self.settings.redis_pool_size,
+                decode_responses=False
             )
             self._client = redis.Redis(connection_pool=self._pool)
             # Test connection
             await self._client.ping()
+            # Load server-side scripts once; callers invoke them by SHA
+            for name, source in _SCRIPTS.items():
+                await self._register_script(name, source)
+            self._tdigest_available = await self._probe_tdigest()
+            self._latency_queue = asyncio.Queue(maxsize=_LATENCY_QUEUE_SIZE)
+            self._latency_task = asyncio.create_task(self._flush_latencies())
+            self._metrics_task = asyncio.create_task(self._flush_metrics())
+            self._last_ping_ok = True
+            self._last_ping_ts = time.monotonic()
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
             logger.info("Redis connection established successfully")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
     
+    async def _register_script(self, name: str, source: str) -> None:
+        """Load a Lua script into the server cache and record its SHA."""
+        self._scripts[name] = await self._client.script_load(source)
+    
+    async def _run_script(self, name: str, keys: tuple, args: tuple):
+        """Invoke a registered script by SHA.
+
+        EVALSHA ships a 40-byte digest instead of the script body. On
+        NOSCRIPT (e.g. the server restarted and lost its script cache)
+        the script is reloaded and the call retried once.
+        """
+        sha = self._scripts[name]
+        try:
+            return await self.client.evalsha(sha, len(keys), *keys, *args)
+        except NoScriptError:
+            await self._register_script(name, _SCRIPTS[name])
+            return await self.client.evalsha(
+                self._scripts[name], len(keys), *keys, *args
+            )
+    
+    async def _probe_tdigest(self) -> bool:
+        """Create the latency t-digest if the server supports it.
+
+        Plain Redis has no TDIGEST commands; the probe fails once at
+        connect time and latency tracking falls back to the capped
+        list.
+        """
+        try:
+            await self._client.tdigest().create(
+                _LATENCY_TDIGEST_KEY, _LATENCY_TDIGEST_COMPRESSION
+            )
+            return True
+        except redis.ResponseError as e:
+            if "already exists" in str(e).lower():
+                return True
+            logger.info(f"t-digest unavailable, using latency list: {e}")
+            return False
+        except Exception as e:
+            logger.info(f"t-digest unavailable, using latency list: {e}")
+            return False
+    
     async def disconnect(self) -> None:
         """Close Redis connection."""
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        if self._metrics_task:
+            self._metrics_task.cancel()
+            try:
+                await self._metrics_task
+            except asyncio.CancelledError:
+                pass
+            self._metrics_task = None
+            # Best-effort final drain of whatever accumulated
+            await self._flush_metric_buffer()
+        if self._latency_task:
+            self._latency_task.cancel()
+            try:
+                await self._latency_task
+            except asyncio.CancelledError:
+                pass
+            self._latency_task = None
+            self._latency_queue = None
         if self._client:
             await self._client.close()
         if self._pool:
             await self._pool.disconnect()
         logger.info("Redis connection closed")
     
+    async def _heartbeat(self) -> None:
+        """Ping once a second and cache the result for is_connected."""
+        while True:
+            await asyncio.sleep(_HEARTBEAT_INTERVAL)
+            try:
+                await self._client.ping()
+                self._last_ping_ok = True
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._last_ping_ok = False
+            self._last_ping_ts = time.monotonic()
+    
     async def is_connected(self) -> bool:
-        """Check if Redis is connected."""
+        """Check if Redis is connected.
+
+        Served from the heartbeat cache while it is fresh, so liveness
+        probes hitting the health endpoint several times a second cost
+        a memory read instead of a round-trip. A live ping remains the
+        fallback if the heartbeat has stalled.
+        """
+        if time.monotonic() - self._last_ping_ts < _HEARTBEAT_FRESH_SECONDS:
+            return self._last_ping_ok
         try:
             if self._client:
                 await self._client.ping()
+                self._last_ping_ok = True
+                self._last_ping_ts = time.monotonic()
                 return True
         except Exception:
             pass
+        self._last_ping_ok = False
+        self._last_ping_ts = time.monotonic()
         return False
     
     @property
@@ -69,17 +277,21 @@ class RedisClient:
     async def store_policy(self, policy: PolicyRule) -> bool:
         """Store a policy rule in Redis."""
         try:
-            key = f"{self.settings.redis_policy_prefix}{policy.rule_id}"
-            await self.client.setex(
-                key,
-                self.settings.policy_cache_ttl,
-                policy.model_dump_json()
-            )
-            # Add to policy index
-            await self.client.sadd(
-                f"{self.settings.redis_policy_prefix}index",
-                policy.rule_id
+            # All policies live in one HASH keyed by rule_id: store is a
+            # single HSET (plus the TTL refresh in the same pipeline)
+            # instead of the old SETEX + SADD pair, and there is no
+            # separate index to keep in sync. orjson serializes the
+            # dump directly (str enums included); pydantic's JSON
+            # encoder stays off the write path.
+            pipe = self.client.pipeline(transaction=True)
+            pipe.hset(
+                self._policy_hash_key,
+                policy.rule_id,
+                orjson.dumps(policy.model_dump()),
             )
+            pipe.expire(self._policy_hash_key, self.settings.policy_cache_ttl)
+            pipe.incr(self._policy_version_key)
+            await pipe.execute()
             logger.debug(f"Stored policy: {policy.rule_id}")
             return True
         except Exception as e:
@@ -89,79 +301,132 @@ class RedisClient:
     async def get_policy(self, rule_id: str) -> Optional[PolicyRule]:
         """Retrieve a policy rule from Redis."""
         try:
-            key = f"{self.settings.redis_policy_prefix}{rule_id}"
-            data = await self.client.get(key)
+            data = await self.client.hget(self._policy_hash_key, rule_id)
             if data:
-                return PolicyRule.model_validate_json(data)
+                # Cached policies were validated when stored, so reads
+                # skip revalidation: orjson parse + model_construct.
+                # ActionType is a str enum, so the raw strings compare
+                # and hash like the members they name.
+                return PolicyRule.model_construct(**orjson.loads(data))
             return None
         except Exception as e:
             logger.error(f"Failed to get policy {rule_id}: {e}")
             return None
     
     async def get_all_policies(self) -> List[PolicyRule]:
-        """Retrieve all active policies from Redis."""
-        policies = []
+        """Retrieve all active policies from Redis.
+
+        Policies change rarely, so the full decode is gated behind a
+        version counter that every mutation bumps: one GET per call,
+        and while the version matches, the locally cached list is
+        served with no HSCAN, no JSON parse and no model construction.
+        The lock lets concurrent callers share a single refetch.
+        """
         try:
-            # Get all policy IDs from index
-            index_key = f"{self.settings.redis_policy_prefix}index"
-            rule_ids = await self.client.smembers(index_key)
+            version = int(await self.client.get(self._policy_version_key) or 0)
+            cached = self._policies_cache
+            if cached is not None and cached[0] == version:
+                return cached[1]
             
-            if not rule_ids:
+            async with self._policies_lock:
+                # Another caller may have refreshed while we waited
+                cached = self._policies_cache
+                if cached is not None and cached[0] == version:
+                    return cached[1]
+                policies = await self._load_all_policies()
+                self._policies_cache = (version, policies)
                 return policies
-            
-            # Batch fetch all policies
-            keys = [f"{self.settings.redis_policy_prefix}{rid}" for rid in rule_ids]
-            values = await self.client.mget(keys)
-            
-            for value in values:
-                if value:
-                    try:
-                        policy = PolicyRule.model_validate_json(value)
-                        if policy.enabled:
-                            policies.append(policy)
-                    except Exception as e:
-                        logger.warning(f"Failed to parse policy: {e}")
-            
-            # Sort by priority (lower = higher priority)
-            policies.sort(key=lambda p: p.priority)
-            logger.debug(f"Loaded {len(policies)} active policies")
-            
         except Exception as e:
             logger.error(f"Failed to get all policies: {e}")
+            return []
+    
+    async def _load_all_policies(self) -> List[PolicyRule]:
+        """Decode the full policy set from Redis.
+
+        The policy HASH is cursored with HSCAN, which returns fields
+        and values together: no index round-trip, no MGET, and bounded
+        batch sizes on both ends regardless of how many policies exist.
+        """
+        policies: List[PolicyRule] = []
+        async for _rid, value in self.client.hscan_iter(
+            self._policy_hash_key, count=_POLICY_SCAN_BATCH
+        ):
+            try:
+                # Trusted cache read: skip revalidation (see
+                # get_policy) and drop disabled entries before
+                # paying for model construction.
+                d = orjson.loads(value)
+                if d.get("enabled"):
+                    policies.append(PolicyRule.model_construct(**d))
+            except Exception as e:
+                logger.warning(f"Failed to parse policy: {e}")
         
+        # Sort by priority (lower = higher priority)
+        policies.sort(key=lambda p: p.priority)
+        logger.debug(f"Loaded {len(policies)} active policies")
         return policies
     
     async def delete_policy(self, rule_id: str) -> bool:
         """Delete a policy rule from Redis."""
         try:
-            key = f"{self.settings.redis_policy_prefix}{rule_id}"
-            await self.client.delete(key)
-            await self.client.srem(
-                f"{self.settings.redis_policy_prefix}index",
-                rule_id
-            )
+            pipe = self.client.pipeline(transaction=True)
+            pipe.hdel(self._policy_hash_key, rule_id)
+            pipe.incr(self._policy_version_key)
+            await pipe.execute()
             logger.debug(f"Deleted policy: {rule_id}")
             return True
         except Exception as e:
             logger.error(f"Failed to delete policy {rule_id}: {e}")
             return False
     
+    async def publish_policy_invalidation(self) -> None:
+        """Tell other workers that a policy changed."""
+        try:
+            await self.client.publish(_POLICY_INVALIDATION_CHANNEL, "1")
+        except Exception as e:
+            logger.error(f"Failed to publish policy invalidation: {e}")
+    
+    async def listen_policy_invalidations(self, callback) -> None:
+        """Invoke callback for each policy-invalidation message.
+
+        Blocks on the pub/sub channel; meant to run inside a background
+        task that handles reconnects.
+        """
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(_POLICY_INVALIDATION_CHANNEL)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    callback()
+        finally:
+            await pubsub.close()
+    
     async def refresh_policies(self, policies: List[PolicyRule]) -> int:
-        """Refresh all policies in cache."""
+        """Refresh all policies in cache.
+
+        One transactional pipeline: DEL the policy HASH, repopulate it
+        with a single mapping HSET, and set the TTL once for the whole
+        set. No per-policy commands and no read beforehand.
+        """
         count = 0
         try:
-            # Clear existing policies
-            index_key = f"{self.settings.redis_policy_prefix}index"
-            existing = await self.client.smembers(index_key)
-            
-            for rule_id in existing:
-                await self.delete_policy(rule_id)
-            
-            # Store new policies
-            for policy in policies:
-                if await self.store_policy(policy):
-                    count += 1
+            pipe = self.client.pipeline(transaction=True)
+            pipe.delete(self._policy_hash_key)
+            if policies:
+                pipe.hset(
+                    self._policy_hash_key,
+                    mapping={
+                        policy.rule_id: orjson.dumps(policy.model_dump())
+                        for policy in policies
+                    },
+                )
+                pipe.expire(
+                    self._policy_hash_key, self.settings.policy_cache_ttl
+                )
+            pipe.incr(self._policy_version_key)
+            await pipe.execute()
             
+            count = len(policies)
             logger.info(f"Refreshed {count} policies in cache")
         except Exception as e:
             logger.error(f"Failed to refresh policies: {e}")
@@ -170,56 +435,89 @@ class RedisClient:
     
     # ==================== Rate Limiting ====================
     
+    async def _rate_limit_take(self, key: str, want: int) -> tuple[int, int]:
+        """Run the sliding-window script; returns (granted, remaining)."""
+        now_ms = int(time.time() * 1000)
+        window_ms = self.settings.rate_limit_window_seconds * 1000
+        args = (
+            now_ms,
+            window_ms,
+            self.settings.rate_limit_requests,
+            want,
+            uuid4().hex,
+        )
+        return await self._run_script("rate_limit", (key,), args)
+    
     async def check_rate_limit(self, agent_id: str) -> tuple[bool, int]:
         """
         Check if agent has exceeded rate limit.
         Returns (is_allowed, remaining_requests).
         """
         try:
-            key = f"{self.settings.redis_rate_limit_prefix}{agent_id}"
-            
-            # Use Redis pipeline for atomic operations
-            pipe = self.client.pipeline()
-            pipe.incr(key)
-            pipe.ttl(key)
-            results = await pipe.execute()
-            
-            current_count = results[0]
-            ttl = results[1]
-            
-            # Set expiry on first request
-            if ttl == -1:
-                await self.client.expire(key, self.settings.rate_limit_window_seconds)
-            
-            remaining = max(0, self.settings.rate_limit_requests - current_count)
-            is_allowed = current_count <= self.settings.rate_limit_requests
-            
-            return is_allowed, remaining
+            key = self._rate_limit_prefix + agent_id
+            granted, remaining = await self._rate_limit_take(key, 1)
+            return granted == 1, remaining
             
         except Exception as e:
             logger.error(f"Rate limit check failed for {agent_id}: {e}")
             # Fail open on error
             return True, self.settings.rate_limit_requests
     
+    async def reserve_rate_limit(self, agent_id: str, count: int) -> tuple[int, int, int]:
+        """Reserve a batch of rate-limit tokens in one round-trip.
+
+        Returns (granted, remaining, window_ttl). granted is how many of
+        the requested tokens fit under the rolling window; callers hand
+        them out locally without further round-trips. A sliding window
+        has no single reset instant, so window_ttl is the window length:
+        the upper bound on when the oldest granted token ages out.
+        """
+        try:
+            key = self._rate_limit_prefix + agent_id
+            granted, remaining = await self._rate_limit_take(key, count)
+            return granted, remaining, self.settings.rate_limit_window_seconds
+
+        except Exception as e:
+            logger.error(f"Rate limit reservation failed for {agent_id}: {e}")
+            # Fail open on error
+            return (
+                count,
+                self.settings.rate_limit_requests,
+                self.settings.rate_limit_window_seconds,
+            )
+
     async def get_rate_limit_info(self, agent_id: str) -> Dict[str, Any]:
-        """Get rate limit information for an agent."""
+        """Get rate limit information for an agent.
+
+        Reads the sliding-window sorted set: expired members are
+        trimmed, ZCARD gives the in-window count, and capacity next
+        frees up when the oldest remaining member ages out.
+        """
         try:
-            key = f"{self.settings.redis_rate_limit_prefix}{agent_id}"
+            key = self._rate_limit_prefix + agent_id
+            now_ms = int(time.time() * 1000)
+            window_ms = self.settings.rate_limit_window_seconds * 1000
             
             pipe = self.client.pipeline()
-            pipe.get(key)
-            pipe.ttl(key)
+            pipe.zremrangebyscore(key, 0, now_ms - window_ms)
+            pipe.zcard(key)
+            pipe.zrange(key, 0, 0, withscores=True)
             results = await pipe.execute()
             
-            current_count = int(results[0] or 0)
-            ttl = max(0, results[1] or 0)
+            current_count = results[1] or 0
+            oldest = results[2]
+            if oldest:
+                reset_ms = int(oldest[0][1]) + window_ms - now_ms
+                reset_in_seconds = max(0, -(-reset_ms // 1000))
+            else:
+                reset_in_seconds = 0
             
             return {
                 "agent_id": agent_id,
                 "current_requests": current_count,
                 "limit": self.settings.rate_limit_requests,
                 "remaining": max(0, self.settings.rate_limit_requests - current_count),
-                "reset_in_seconds": ttl,
+                "reset_in_seconds": reset_in_seconds,
                 "window_seconds": self.settings.rate_limit_window_seconds
             }
         except Exception as e:
@@ -229,37 +527,58 @@ class RedisClient:
     # ==================== Approval Tracking ====================
     
     async def store_pending_approval(
-        self, 
-        approval_id: str, 
-        request_data: Dict[str, Any],
-        ttl: int = 3600
+        self,
+        approval_id: str,
+        payload: bytes,
     ) -> bool:
-        """Store a pending approval request."""
+        """Store a pending approval as a field in the current day bucket."""
         try:
-            key = f"sentinel:approval:{approval_id}"
-            await self.client.setex(key, ttl, json.dumps(request_data, default=str))
+            bucket = int(time.time() // _APPROVAL_BUCKET_SECONDS)
+            key = _APPROVAL_BUCKET_PREFIX + str(bucket)
+            pipe = self.client.pipeline()
+            pipe.hset(key, approval_id, payload)
+            # Set the bucket TTL only when we roll into a new bucket,
+            # not on every store.
+            if bucket != self._last_approval_bucket:
+                pipe.expire(key, _APPROVAL_BUCKET_TTL)
+                self._last_approval_bucket = bucket
+            await pipe.execute()
             return True
         except Exception as e:
             logger.error(f"Failed to store pending approval {approval_id}: {e}")
             return False
-    
+
     async def get_pending_approval(self, approval_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a pending approval request."""
         try:
-            key = f"sentinel:approval:{approval_id}"
-            data = await self.client.get(key)
+            bucket = int(time.time() // _APPROVAL_BUCKET_SECONDS)
+            # Check current then previous bucket to span the TTL boundary
+            data = await self.client.hget(
+                _APPROVAL_BUCKET_PREFIX + str(bucket), approval_id
+            )
+            if data is None:
+                data = await self.client.hget(
+                    _APPROVAL_BUCKET_PREFIX + str(bucket - 1), approval_id
+                )
+            if data is None:
+                # Legacy per-approval key, kept for rolling migration
+                data = await self.client.get(_APPROVAL_LEGACY_PREFIX + approval_id)
             if data:
-                return json.loads(data)
+                return orjson.loads(data)
             return None
         except Exception as e:
             logger.error(f"Failed to get pending approval {approval_id}: {e}")
             return None
-    
+
     async def delete_pending_approval(self, approval_id: str) -> bool:
         """Delete a pending approval request."""
         try:
-            key = f"sentinel:approval:{approval_id}"
-            await self.client.delete(key)
+            bucket = int(time.time() // _APPROVAL_BUCKET_SECONDS)
+            pipe = self.client.pipeline()
+            pipe.hdel(_APPROVAL_BUCKET_PREFIX + str(bucket), approval_id)
+            pipe.hdel(_APPROVAL_BUCKET_PREFIX + str(bucket - 1), approval_id)
+            pipe.delete(_APPROVAL_LEGACY_PREFIX + approval_id)
+            await pipe.execute()
             return True
         except Exception as e:
             logger.error(f"Failed to delete pending approval {approval_id}: {e}")
@@ -268,50 +587,138 @@ class RedisClient:
     # ==================== Metrics ====================
     
     async def increment_metric(self, metric_name: str, value: int = 1) -> None:
-        """Increment a metric counter."""
+        """Increment a metric counter.
+
+        Counts accumulate in a local Counter with no await; the
+        background flush task drains them into the metrics HASH.
+        """
+        self._metric_buf[metric_name] += value
+    
+    async def _flush_metrics(self) -> None:
+        """Periodically drain buffered counter increments into Redis."""
+        while True:
+            await asyncio.sleep(_METRICS_FLUSH_INTERVAL)
+            await self._flush_metric_buffer()
+    
+    async def _flush_metric_buffer(self) -> None:
+        """Write and reset the local counter buffer; one pipeline RTT."""
+        if not self._metric_buf:
+            return
+        snapshot = self._metric_buf
+        self._metric_buf = Counter()
         try:
-            key = f"sentinel:metrics:{metric_name}"
-            await self.client.incrby(key, value)
+            pipe = self.client.pipeline(transaction=False)
+            for name, value in snapshot.items():
+                pipe.hincrby(_METRICS_HASH_KEY, name, value)
+            await pipe.execute()
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"Failed to increment metric {metric_name}: {e}")
+            logger.error(f"Failed to flush metric counters: {e}")
     
+    async def get_metrics_bulk(self, metric_names: List[str]) -> Dict[str, int]:
+        """Fetch several metric counters in a single HMGET round-trip."""
+        try:
+            values = await self.client.hmget(_METRICS_HASH_KEY, metric_names)
+            return {
+                name: int(value) if value else 0
+                for name, value in zip(metric_names, values)
+            }
+        except Exception as e:
+            logger.error(f"Failed to bulk-get metrics: {e}")
+            return {name: 0 for name in metric_names}
+
     async def get_metric(self, metric_name: str) -> int:
         """Get a metric value."""
         try:
-            key = f"sentinel:metrics:{metric_name}"
-            value = await self.client.get(key)
+            value = await self.client.hget(_METRICS_HASH_KEY, metric_name)
             return int(value) if value else 0
         except Exception as e:
             logger.error(f"Failed to get metric {metric_name}: {e}")
             return 0
     
     async def record_latency(self, latency_ms: float) -> None:
-        """Record request latency for percentile calculations."""
+        """Queue a latency sample for the background flush task.
+
+        The request path only appends to an in-process queue; no Redis
+        round-trip. On overload (full queue) the sample is dropped --
+        telemetry never applies backpressure to requests.
+        """
+        if self._latency_queue is None:
+            return
         try:
-            key = "sentinel:metrics:latencies"
-            # Keep last 10000 latencies
-            await self.client.lpush(key, latency_ms)
-            await self.client.ltrim(key, 0, 9999)
-        except Exception as e:
-            logger.error(f"Failed to record latency: {e}")
+            self._latency_queue.put_nowait(latency_ms)
+        except asyncio.QueueFull:
+            pass
+    
+    async def _flush_latencies(self) -> None:
+        """Drain queued latency samples into Redis in batches.
+
+        Each iteration blocks for one sample, greedily drains whatever
+        else is queued (up to the batch cap), and writes the batch with
+        a single round-trip: one TDIGEST.ADD, or one pipelined
+        LPUSH + LTRIM on the list fallback.
+        """
+        queue = self._latency_queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < _LATENCY_FLUSH_BATCH:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                if self._tdigest_available:
+                    await self.client.tdigest().add(
+                        _LATENCY_TDIGEST_KEY, batch
+                    )
+                else:
+                    # Keep last 10000 latencies
+                    pipe = self.client.pipeline(transaction=False)
+                    pipe.lpush(_LATENCY_LIST_KEY, *batch)
+                    pipe.ltrim(_LATENCY_LIST_KEY, 0, 9999)
+                    await pipe.execute()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to flush latency batch: {e}")
     
     async def get_latency_percentiles(self) -> Dict[str, float]:
         """Calculate latency percentiles."""
         try:
-            key = "sentinel:metrics:latencies"
-            latencies = await self.client.lrange(key, 0, -1)
+            if self._tdigest_available:
+                # Quantiles and mean come straight from the sketch; no
+                # raw samples cross the wire and nothing is sorted.
+                tdigest = self.client.tdigest()
+                quantiles = await tdigest.quantile(
+                    _LATENCY_TDIGEST_KEY, 0.50, 0.95, 0.99
+                )
+                avg = await tdigest.trimmed_mean(_LATENCY_TDIGEST_KEY, 0, 1)
+                p50, p95, p99 = (float(q) for q in quantiles)
+                avg = float(avg)
+                # An empty sketch reports NaN across the board
+                if p50 != p50:
+                    return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "avg": 0.0}
+                return {"p50": p50, "p95": p95, "p99": p99, "avg": avg}
+            
+            latencies = await self.client.lrange(_LATENCY_LIST_KEY, 0, -1)
             
             if not latencies:
                 return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "avg": 0.0}
             
-            values = sorted([float(l) for l in latencies])
-            n = len(values)
+            # Selection, not sorting: np.percentile's introselect finds
+            # the order statistics in O(n) vectorized C, and fromiter
+            # fills the one array without an intermediate list.
+            arr = np.fromiter(
+                map(float, latencies), dtype=np.float32, count=len(latencies)
+            )
+            p50, p95, p99 = np.percentile(arr, (50, 95, 99), method="nearest")
             
             return {
-                "p50": values[int(n * 0.50)] if n > 0 else 0.0,
-                "p95": values[int(n * 0.95)] if n > 0 else 0.0,
-                "p99": values[int(n * 0.99)] if n > 0 else 0.0,
-                "avg": sum(values) / n if n > 0 else 0.0
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+                "avg": float(arr.mean()),
             }
         except Exception as e:
             logger.error(f"Failed to get latency percentiles: {e}")
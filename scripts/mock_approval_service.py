@@ -6,28 +6,63 @@ For development and testing purposes.
 import asyncio
 import logging
 import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, BackgroundTasks, HTTPException
-from pydantic import BaseModel, Field
+import httpx
+import orjson
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Request
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mock-approval")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared HTTP client for gateway callbacks.
+
+    One pooled client for the process: callbacks reuse kept-alive
+    connections instead of paying a DNS lookup and TCP handshake per
+    call, which previously dominated callback latency.
+    """
+    app.state.http = httpx.AsyncClient(
+        timeout=5.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    )
+    yield
+    await app.state.http.aclose()
+
+
 app = FastAPI(
     title="Mock Approval Service",
     description="Simulates human-in-the-loop approval workflows for Sentinel Gateway",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
-# In-memory storage for pending approvals
-pending_approvals: Dict[str, Dict[str, Any]] = {}
-approval_history: List[Dict[str, Any]] = []
+# In-memory storage: one insertion-ordered index holding pending and
+# decided records alike, so lookups are O(1) instead of scanning a
+# history list, and decisions mutate records in place instead of
+# pop-and-append. The set tracks which IDs are still pending; the
+# OrderedDict doubles as an LRU-by-insertion bound via popitem.
+MAX_RECORDS = 10_000
+approval_index: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+pending_ids: set = set()
 
 
-class ApprovalWebhookPayload(BaseModel):
+# Request bodies are decoded with orjson into slots dataclasses instead
+# of going through FastAPI's pydantic body parsing: the schemas are flat,
+# the sender is the gateway itself, and skipping validation keeps the
+# webhook hot path cheap (same trade the gateway makes for its own
+# internal models).
+
+
+@dataclass(slots=True)
+class ApprovalWebhookPayload:
     """Incoming webhook payload from Sentinel Gateway."""
     event: str
     approval_id: str
@@ -38,27 +73,41 @@ class ApprovalWebhookPayload(BaseModel):
     risk_score: float
     risk_level: str
     matched_rules: List[str]
-    parameters: Dict[str, Any] = Field(default_factory=dict)
-    context: Dict[str, Any] = Field(default_factory=dict)
     requested_at: str
-    expires_at: Optional[str] = None
     callback_url: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    context: Dict[str, Any] = field(default_factory=dict)
+    expires_at: Optional[str] = None
 
 
-class ApprovalDecision(BaseModel):
+@dataclass(slots=True)
+class ApprovalDecision:
     """Approval decision from human reviewer."""
     approved: bool
     approver_id: str = "mock_approver"
     reason: Optional[str] = None
 
 
+_PAYLOAD_FIELDS = frozenset(f.name for f in fields(ApprovalWebhookPayload))
+_DECISION_FIELDS = frozenset(f.name for f in fields(ApprovalDecision))
+
+
+def _decode_body(body: bytes, cls, allowed: frozenset):
+    """Decode a JSON body into a dataclass, ignoring unknown keys."""
+    try:
+        data = orjson.loads(body)
+        return cls(**{k: v for k, v in data.items() if k in allowed})
+    except (orjson.JSONDecodeError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid payload: {e}")
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
     return {
         "service": "Mock Approval Service",
         "status": "operational",
-        "pending_approvals": len(pending_approvals),
+        "pending_approvals": len(pending_ids),
     }
 
 
@@ -70,7 +119,7 @@ async def health():
 
 @app.post("/webhook")
 async def receive_approval_request(
-    payload: ApprovalWebhookPayload,
+    request: Request,
     background_tasks: BackgroundTasks,
 ):
     """
@@ -80,18 +129,26 @@ async def receive_approval_request(
     2. Notify reviewers via Slack/Email/etc.
     3. Present a UI for review
     """
+    payload = _decode_body(
+        await request.body(), ApprovalWebhookPayload, _PAYLOAD_FIELDS
+    )
     logger.info(f"Received approval request: {payload.approval_id}")
     logger.info(f"  Agent: {payload.agent_id}")
     logger.info(f"  Action: {payload.action_type}")
     logger.info(f"  Risk Score: {payload.risk_score}")
     logger.info(f"  Matched Rules: {payload.matched_rules}")
     
-    # Store pending approval
-    pending_approvals[payload.approval_id] = {
-        "payload": payload.model_dump(),
+    # Store pending approval (the dataclass itself; FastAPI encodes
+    # dataclasses when the record is returned from the read endpoints)
+    approval_index[payload.approval_id] = {
+        "payload": payload,
         "received_at": datetime.utcnow().isoformat(),
         "status": "pending",
     }
+    pending_ids.add(payload.approval_id)
+    while len(approval_index) > MAX_RECORDS:
+        evicted_id, _ = approval_index.popitem(last=False)
+        pending_ids.discard(evicted_id)
     
     # Simulate auto-approval after delay for testing
     # In production, this would wait for human decision
@@ -114,104 +171,93 @@ async def auto_approve_after_delay(approval_id: str, delay_seconds: float):
     """Auto-approve after a delay for testing purposes."""
     await asyncio.sleep(delay_seconds)
     
-    if approval_id in pending_approvals:
-        approval = pending_approvals[approval_id]
+    if approval_id in pending_ids:
+        approval = approval_index[approval_id]
         payload = approval["payload"]
         
-        # Make callback to Sentinel Gateway
-        import httpx
-        
+        # Make callback to Sentinel Gateway over the shared client
         try:
-            callback_url = f"http://gateway:8000{payload['callback_url']}"
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    callback_url,
-                    params={
-                        "approved": True,
-                        "approver_id": "auto_approver",
-                        "reason": "Auto-approved for testing (risk_score < 0.9)",
-                    },
-                )
-                logger.info(
-                    f"Auto-approval callback sent for {approval_id}: "
-                    f"status={response.status_code}"
-                )
+            callback_url = f"http://gateway:8000{payload.callback_url}"
+            response = await app.state.http.post(
+                callback_url,
+                params={
+                    "approved": True,
+                    "approver_id": "auto_approver",
+                    "reason": "Auto-approved for testing (risk_score < 0.9)",
+                },
+            )
+            logger.info(
+                f"Auto-approval callback sent for {approval_id}: "
+                f"status={response.status_code}"
+            )
         except Exception as e:
             logger.error(f"Failed to send auto-approval callback: {e}")
         
-        # Update status
-        pending_approvals[approval_id]["status"] = "auto_approved"
-        pending_approvals[approval_id]["decided_at"] = datetime.utcnow().isoformat()
-        
-        # Move to history
-        approval_history.append(pending_approvals.pop(approval_id))
+        # Decide in place; the record keeps its slot in the index
+        approval["status"] = "auto_approved"
+        approval["decided_at"] = datetime.utcnow().isoformat()
+        pending_ids.discard(approval_id)
 
 
 @app.get("/approvals")
 async def list_pending_approvals():
     """List all pending approvals."""
     return {
-        "pending": list(pending_approvals.values()),
-        "count": len(pending_approvals),
+        "pending": [approval_index[aid] for aid in pending_ids],
+        "count": len(pending_ids),
     }
 
 
 @app.get("/approvals/{approval_id}")
 async def get_approval(approval_id: str):
     """Get a specific approval by ID."""
-    if approval_id in pending_approvals:
-        return pending_approvals[approval_id]
-    
-    # Check history
-    for item in approval_history:
-        if item["payload"]["approval_id"] == approval_id:
-            return item
+    approval = approval_index.get(approval_id)
+    if approval is not None:
+        return approval
     
     raise HTTPException(status_code=404, detail="Approval not found")
 
 
 @app.post("/approvals/{approval_id}/decide")
-async def submit_decision(approval_id: str, decision: ApprovalDecision):
+async def submit_decision(approval_id: str, request: Request):
     """
     Submit a manual approval/denial decision.
     Used for testing the human-in-the-loop flow.
     """
-    if approval_id not in pending_approvals:
+    decision = _decode_body(
+        await request.body(), ApprovalDecision, _DECISION_FIELDS
+    )
+    if approval_id not in pending_ids:
         raise HTTPException(status_code=404, detail="Approval not found or already decided")
     
-    approval = pending_approvals[approval_id]
+    approval = approval_index[approval_id]
     payload = approval["payload"]
     
-    # Make callback to Sentinel Gateway
-    import httpx
-    
+    # Make callback to Sentinel Gateway over the shared client
     try:
-        callback_url = f"http://gateway:8000{payload['callback_url']}"
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                callback_url,
-                params={
-                    "approved": decision.approved,
-                    "approver_id": decision.approver_id,
-                    "reason": decision.reason or "",
-                },
-            )
-            logger.info(
-                f"Decision callback sent for {approval_id}: "
-                f"approved={decision.approved}, status={response.status_code}"
-            )
+        callback_url = f"http://gateway:8000{payload.callback_url}"
+        response = await app.state.http.post(
+            callback_url,
+            params={
+                "approved": decision.approved,
+                "approver_id": decision.approver_id,
+                "reason": decision.reason or "",
+            },
+        )
+        logger.info(
+            f"Decision callback sent for {approval_id}: "
+            f"approved={decision.approved}, status={response.status_code}"
+        )
     except Exception as e:
         logger.error(f"Failed to send decision callback: {e}")
         raise HTTPException(status_code=500, detail=f"Callback failed: {e}")
     
-    # Update status
+    # Decide in place; the record keeps its slot in the index
     status = "approved" if decision.approved else "denied"
-    pending_approvals[approval_id]["status"] = status
-    pending_approvals[approval_id]["decided_at"] = datetime.utcnow().isoformat()
-    pending_approvals[approval_id]["decision"] = decision.model_dump()
-    
-    # Move to history
-    approval_history.append(pending_approvals.pop(approval_id))
+    approval["status"] = status
+    approval["decided_at"] = datetime.utcnow().isoformat()
+    approval["decision"] = decision
+    pending_ids.discard(approval_id)
     
     return {
         "status": status,
@@ -223,17 +269,25 @@ async def submit_decision(approval_id: str, decision: ApprovalDecision):
 @app.get("/history")
 async def get_approval_history(limit: int = 100):
     """Get approval decision history."""
+    decided = []
+    # Newest first while collecting, restored to insertion order below
+    for record in reversed(approval_index.values()):
+        if record["status"] != "pending":
+            decided.append(record)
+            if len(decided) >= limit:
+                break
+    decided.reverse()
     return {
-        "history": approval_history[-limit:],
-        "total": len(approval_history),
+        "history": decided,
+        "total": len(approval_index) - len(pending_ids),
     }
 
 
 @app.delete("/approvals")
 async def clear_all():
     """Clear all pending approvals and history (for testing)."""
-    pending_approvals.clear()
-    approval_history.clear()
+    approval_index.clear()
+    pending_ids.clear()
     return {"status": "cleared"}
 
 